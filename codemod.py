@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Multi-edit codemod engine
+Applies many block replacements across source files (e.g. src/screens/*.tsx)
+with one read and one write per file.
+
+Each edit in the spec names a file, a start-marker line, an end pattern and the
+replacement text. The block runs from the start marker down to (and including)
+the first line of the end pattern; the remaining pattern lines are lookahead
+that must follow it, exactly like the hard-coded check in replace_block.py.
+
+Spec format (JSON list):
+    [
+      {
+        "file": "src/screens/JourneyMapScreen.tsx",
+        "start": "  const renderLevelCard = (level: ConsciousnessLevel, index: number) => {",
+        "end": ["  };", "", {"startswith": "  const renderCategorySection"}],
+        "replacement": "...",            # or "replacement_file": "path/to/block.tsx"
+        "occurrence": 0                  # optional, which match of "start" to use
+      }
+    ]
+
+Usage:
+    python codemod.py spec.json              # apply
+    python codemod.py spec.json --dry-run    # print unified diff only
+    python codemod.py spec.json --jobs 8     # files processed in parallel
+"""
+
+import argparse
+import difflib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# A line matcher is either an exact line or a predicate on the line text
+LineMatcher = Union[str, Callable[[str], bool]]
+
+
+class CodemodError(Exception):
+    """Raised when an edit cannot be located or conflicts with another edit"""
+
+
+@dataclass
+class Edit:
+    """A single block replacement"""
+    file: str
+    start: str
+    end: Sequence[LineMatcher]
+    replacement: str
+    occurrence: int = 0
+
+
+@dataclass
+class FileResult:
+    """Outcome of applying all edits for one file"""
+    path: str
+    edits: int
+    changed: bool
+    diff: str = ""
+    error: Optional[str] = None
+
+
+def _matches(matcher: LineMatcher, line: str) -> bool:
+    if callable(matcher):
+        return matcher(line)
+    return line == matcher
+
+
+def _parse_matcher(raw) -> LineMatcher:
+    """Convert a JSON end-pattern entry into a line matcher"""
+    if isinstance(raw, str):
+        return raw
+    if isinstance(raw, dict):
+        if "startswith" in raw:
+            prefix = raw["startswith"]
+            return lambda line: line.startswith(prefix)
+        if "contains" in raw:
+            needle = raw["contains"]
+            return lambda line: needle in line
+        if "strip" in raw:
+            text = raw["strip"]
+            return lambda line: line.strip() == text
+    raise CodemodError(f"Unsupported end matcher: {raw!r}")
+
+
+def load_spec(spec_path: str) -> List[Edit]:
+    """Load edits from a JSON spec; relative paths resolve against the spec's directory"""
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        raw_edits = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(spec_path))
+    edits = []
+    for i, raw in enumerate(raw_edits):
+        try:
+            if "replacement_file" in raw:
+                with open(os.path.join(base_dir, raw["replacement_file"]), 'r', encoding='utf-8') as f:
+                    replacement = f.read().rstrip("\n")
+            else:
+                replacement = raw["replacement"]
+            end = raw["end"]
+            if isinstance(end, str):
+                end = [end]
+            edits.append(Edit(
+                file=raw["file"],
+                start=raw["start"],
+                end=[_parse_matcher(m) for m in end],
+                replacement=replacement,
+                occurrence=raw.get("occurrence", 0),
+            ))
+        except KeyError as e:
+            raise CodemodError(f"Spec entry {i} is missing {e}") from e
+    return edits
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split on "\n" only, keeping each line's own terminator ("\n", "\r\n" or none)
+
+    str.splitlines() would also break on form feeds, \u2028 and friends and
+    lose the difference between LF and CRLF lines in mixed files.
+    """
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _eol(line: str) -> str:
+    if line.endswith("\r\n"):
+        return "\r\n"
+    return "\n" if line.endswith("\n") else ""
+
+
+def _body(line: str) -> str:
+    """A line without its terminator, as matched against the spec"""
+    return line[:len(line) - len(_eol(line))]
+
+
+def _read_lines(path: str) -> List[str]:
+    """Read a file once, returning its lines with their terminators"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return _split_lines(f.read())
+
+
+def _index_lines(lines: List[str]) -> Dict[str, List[int]]:
+    """Map each distinct line to the indexes where it occurs"""
+    index: Dict[str, List[int]] = {}
+    for i, line in enumerate(lines):
+        index.setdefault(line, []).append(i)
+    return index
+
+
+def _locate(edit: Edit, lines: List[str], index: Dict[str, List[int]]) -> Tuple[int, int]:
+    """Return the inclusive (start, end) line span an edit replaces"""
+    starts = index.get(edit.start)
+    if not starts or edit.occurrence >= len(starts):
+        raise CodemodError(f"Start marker not found: {edit.start.strip()!r}")
+    start_idx = starts[edit.occurrence]
+
+    end_pattern = list(edit.end)
+    if not end_pattern:
+        return start_idx, start_idx
+
+    # If the first end line is an exact string, only visit its indexed positions
+    if isinstance(end_pattern[0], str):
+        candidates = [i for i in index.get(end_pattern[0], []) if i >= start_idx]
+    else:
+        candidates = range(start_idx, len(lines))
+
+    for end_idx in candidates:
+        if end_idx + len(end_pattern) > len(lines):
+            break
+        if all(_matches(m, lines[end_idx + k]) for k, m in enumerate(end_pattern)):
+            return start_idx, end_idx
+    raise CodemodError(f"End marker not found after: {edit.start.strip()!r}")
+
+
+def apply_edits(lines: List[str], edits: Sequence[Edit]) -> List[str]:
+    """Apply all edits to one file's lines (terminators included) in a single pass
+
+    Replacement lines take the line ending of the block they replace, so
+    the rest of the file keeps its layout byte for byte.
+    """
+    bodies = [_body(line) for line in lines]
+    index = _index_lines(bodies)
+    spans = sorted(((*_locate(e, bodies, index), e) for e in edits), key=lambda s: s[0])
+
+    for (_, prev_end, prev), (start, _, edit) in zip(spans, spans[1:]):
+        if start <= prev_end:
+            raise CodemodError(
+                f"Overlapping edits: {prev.start.strip()!r} and {edit.start.strip()!r}"
+            )
+
+    out: List[str] = []
+    cursor = 0
+    for start, end, edit in spans:
+        out.extend(lines[cursor:start])
+        replacement = [line[:-1] if line.endswith("\r") else line for line in edit.replacement.split("\n")]
+        eol = _eol(lines[start]) or "\n"
+        out.extend(line + eol for line in replacement[:-1])
+        out.append(replacement[-1] + _eol(lines[end]))
+        cursor = end + 1
+    out.extend(lines[cursor:])
+    return out
+
+
+def _atomic_write(path: str, text: str):
+    """Write via a temp file in the same directory and swap it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".codemod-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def process_file(path: str, edits: Sequence[Edit], dry_run: bool = False) -> FileResult:
+    """Read a file once, apply its edits and write it back (or diff it)"""
+    try:
+        lines = _read_lines(path)
+        new_lines = apply_edits(lines, edits)
+    except (OSError, CodemodError) as e:
+        return FileResult(path=path, edits=len(edits), changed=False, error=str(e))
+
+    changed = new_lines != lines
+    diff = ""
+    if changed and dry_run:
+        diff = "".join(difflib.unified_diff(
+            [_body(l) + "\n" for l in lines],
+            [_body(l) + "\n" for l in new_lines],
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}",
+        ))
+    if changed and not dry_run:
+        _atomic_write(path, "".join(new_lines))
+    return FileResult(path=path, edits=len(edits), changed=changed, diff=diff)
+
+
+def run(edits: Sequence[Edit], dry_run: bool = False, jobs: int = 4) -> List[FileResult]:
+    """Group edits by file and process the files in parallel"""
+    by_file: Dict[str, List[Edit]] = {}
+    for edit in edits:
+        by_file.setdefault(os.path.normpath(edit.file), []).append(edit)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [pool.submit(process_file, path, file_edits, dry_run)
+                   for path, file_edits in by_file.items()]
+        return [f.result() for f in futures]
+
+
+def main():
+    # Fix Windows console encoding (here rather than at import: replace_block.py imports this module)
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+    parser = argparse.ArgumentParser(description="Apply a multi-edit codemod spec")
+    parser.add_argument("spec", help="JSON file listing the edits")
+    parser.add_argument("--dry-run", action="store_true", help="Print a unified diff instead of writing")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4, help="Files processed in parallel")
+    args = parser.parse_args()
+
+    try:
+        edits = load_spec(args.spec)
+    except (OSError, ValueError, CodemodError) as e:
+        print(f"[ERROR] Could not load spec: {e}")
+        sys.exit(1)
+
+    results = run(edits, dry_run=args.dry_run, jobs=args.jobs)
+
+    failed = 0
+    for result in results:
+        if result.error:
+            failed += 1
+            print(f"[ERROR] {result.path}: {result.error}")
+        elif result.diff:
+            sys.stdout.write(result.diff)
+        elif result.changed:
+            print(f"[OK] {result.path}: {result.edits} edit(s) applied")
+        else:
+            print(f"[SKIP] {result.path}: already up to date")
+
+    print(f"\nFiles: {len(results)}, edits: {len(edits)}, failed: {failed}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,5 @@
-from pathlib import Path
+from codemod import Edit, run
 
-path = Path(r"src/screens/JourneyMapScreen.tsx")
-lines = path.read_text().splitlines()
-start_idx = lines.index("  const renderLevelCard = (level: ConsciousnessLevel, index: number) => {")
-end_idx = start_idx
-while end_idx < len(lines):
-    if lines[end_idx] == "  };" and end_idx + 2 < len(lines) and lines[end_idx + 1] == "" and lines[end_idx + 2].startswith("  const renderCategorySection"):
-        break
-    end_idx += 1
 new_block = """  const renderLevelCard = (level: ConsciousnessLevel, index: number) => {
     const isExplored = progress?.exploredLevels.includes(level.id) ?? false;
     const isCurrent = progress?.currentLevel === level.id;
@@ -54,5 +46,12 @@ new_block = """  const renderLevelCard = (level: ConsciousnessLevel, index: numb
       />
     );
   };"""
-lines[start_idx:end_idx+1] = new_block.splitlines()
-path.write_text("\n".join(lines) + "\n")
+edit = Edit(
+    file="src/screens/JourneyMapScreen.tsx",
+    start="  const renderLevelCard = (level: ConsciousnessLevel, index: number) => {",
+    end=["  };", "", lambda line: line.startswith("  const renderCategorySection")],
+    replacement=new_block,
+)
+for result in run([edit]):
+    if result.error:
+        raise SystemExit(f"[ERROR] {result.path}: {result.error}")
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Async COMFYUI API client
+
+One client holds a small pool of keep-alive HTTP/1.1 connections, so the
+hundreds of status polls and frame downloads in a batch reuse a handful of
+sockets instead of opening one per request. Requests may run concurrently
+(up to max_connections at a time) and response bodies can be streamed.
+
+Standard library only (asyncio streams), like the rest of the scripts.
+
+Usage:
+    async with ComfyUIClient("http://127.0.0.1:8188") as client:
+        stats = await client.system_stats()
+        prompt_id = (await client.queue_prompt(workflow))['prompt_id']
+        if await client.wait_for_completion(prompt_id, timeout=600):
+            history = await client.get_history(prompt_id)
+"""
+
+import asyncio
+import json
+import ssl
+import time
+import urllib.parse
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+# Default COMFYUI API endpoint
+COMFYUI_URL = "http://127.0.0.1:8188"
+
+CHUNK_SIZE = 64 * 1024
+
+# Methods safe to resend when a reused connection turns out to be dead
+_RETRY_METHODS = ('GET', 'HEAD')
+
+
+class ComfyUIError(Exception):
+    """HTTP error returned by the COMFYUI server"""
+
+    def __init__(self, status: int, reason: str, body: bytes = b""):
+        self.status = status
+        self.reason = reason
+        self.body = body.decode('utf-8', errors='replace')
+        super().__init__(f"HTTP {status} {reason}")
+
+    @property
+    def details(self) -> Optional[Dict]:
+        """Parsed JSON error body (COMFYUI sends {"error": ..., "node_errors": ...})"""
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class Response:
+    """A response whose body is read on demand from the pooled connection"""
+
+    def __init__(self, conn: _Connection, method: str, status: int, reason: str,
+                 headers: Dict[str, str], timeout: float):
+        self._conn = conn
+        self._timeout = timeout
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.keep_alive = headers.get('connection', '').lower() != 'close'
+        self._chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        length = headers.get('content-length')
+        self._remaining = int(length) if length is not None else None
+        self.consumed = False
+
+        if method == 'HEAD' or status in (204, 304) or (100 <= status < 200):
+            self._chunked = False
+            self._remaining = 0
+        if not self._chunked and self._remaining is None:
+            # Body runs until the server closes the socket
+            self.keep_alive = False
+
+    async def _read(self, coro):
+        return await asyncio.wait_for(coro, self._timeout)
+
+    async def iter_chunks(self, size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield the body in pieces without buffering all of it"""
+        reader = self._conn.reader
+        if self._chunked:
+            while True:
+                line = await self._read(reader.readline())
+                chunk_size = int(line.split(b';')[0].strip() or b'0', 16)
+                if chunk_size == 0:
+                    # Skip trailers up to the terminating blank line
+                    while (await self._read(reader.readline())) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                while chunk_size:
+                    piece = await self._read(reader.readexactly(min(size, chunk_size)))
+                    chunk_size -= len(piece)
+                    yield piece
+                await self._read(reader.readexactly(2))
+        elif self._remaining is not None:
+            while self._remaining:
+                piece = await self._read(reader.readexactly(min(size, self._remaining)))
+                self._remaining -= len(piece)
+                yield piece
+        else:
+            while True:
+                piece = await self._read(reader.read(size))
+                if not piece:
+                    break
+                yield piece
+        self.consumed = True
+
+    async def read(self) -> bytes:
+        return b"".join([piece async for piece in self.iter_chunks()])
+
+    async def json(self):
+        return json.loads(await self.read())
+
+
+class ComfyUIClient:
+    """Keep-alive connection pool plus the COMFYUI endpoints the scripts use"""
+
+    def __init__(self, base_url: str = COMFYUI_URL, max_connections: int = 4, timeout: float = 30):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.host = parsed.hostname or '127.0.0.1'
+        self.ssl = ssl.create_default_context() if parsed.scheme == 'https' else None
+        self.port = parsed.port or (443 if self.ssl else 80)
+        self.prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle: Deque[_Connection] = deque()
+        self._slots = asyncio.Semaphore(max_connections)
+        self.connections_opened = 0
+
+    async def __aenter__(self) -> "ComfyUIClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            conn = self._idle.popleft()
+            conn.close()
+            try:
+                await conn.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _acquire(self) -> _Connection:
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.closed:
+                conn.reused = True
+                return conn
+            conn.close()
+        return await self._open()
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def _release(self, conn: _Connection, response: Optional[Response]):
+        if response is not None and response.consumed and response.keep_alive and not conn.closed:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    async def _send(self, conn: _Connection, method: str, target: str,
+                    body: Optional[bytes], content_type: Optional[str]) -> Response:
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept-Encoding: identity",
+        ]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+            if content_type:
+                lines.append(f"Content-Type: {content_type}")
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (body or b""))
+        await conn.writer.drain()
+
+        status_line = await asyncio.wait_for(conn.reader.readline(), self.timeout)
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        _, status, *reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await asyncio.wait_for(conn.reader.readline(), self.timeout)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return Response(conn, method, int(status), reason[0] if reason else '', headers, self.timeout)
+
+    def _target(self, path: str, params: Optional[Dict] = None) -> str:
+        target = self.prefix + path
+        if params:
+            target += '?' + urllib.parse.urlencode(params)
+        return target
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, params: Optional[Dict] = None,
+                     json_body=None) -> AsyncIterator[Response]:
+        """Send a request and yield the response with its body still unread
+
+        Raises ComfyUIError for non-2xx responses.
+        """
+        body = json.dumps(json_body).encode('utf-8') if json_body is not None else None
+        content_type = 'application/json' if body is not None else None
+        target = self._target(path, params)
+
+        async with self._slots:
+            conn = await self._acquire()
+            try:
+                try:
+                    response = await self._send(conn, method, target, body, content_type)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not conn.reused or method not in _RETRY_METHODS:
+                        raise
+                    # The server dropped an idle keep-alive socket: retry once on a new one.
+                    # Never for POST, which the server may already have acted on (a queued prompt)
+                    conn.close()
+                    conn = await self._open()
+                    response = await self._send(conn, method, target, body, content_type)
+            except BaseException:
+                conn.close()
+                raise
+
+            try:
+                if not 200 <= response.status < 300:
+                    raise ComfyUIError(response.status, response.reason, await response.read())
+                yield response
+            finally:
+                self._release(conn, response)
+
+    async def request(self, method: str, path: str, params: Optional[Dict] = None, json_body=None) -> bytes:
+        async with self.stream(method, path, params, json_body) as response:
+            return await response.read()
+
+    async def get_json(self, path: str, params: Optional[Dict] = None):
+        return json.loads(await self.request('GET', path, params))
+
+    # COMFYUI endpoints
+
+    async def system_stats(self) -> Dict:
+        return await self.get_json('/system_stats')
+
+    async def object_info(self) -> Dict:
+        return await self.get_json('/object_info')
+
+    async def queue_prompt(self, prompt: Dict) -> Dict:
+        """Queue a prompt; raises ComfyUIError with node errors in .details on rejection"""
+        return json.loads(await self.request('POST', '/prompt', json_body={"prompt": prompt}))
+
+    async def get_history(self, prompt_id: str) -> Dict:
+        return await self.get_json(f'/history/{prompt_id}')
+
+    async def get_queue(self) -> Dict:
+        """Running and pending prompts ({"queue_running": [...], "queue_pending": [...]})"""
+        return await self.get_json('/queue')
+
+    async def cancel_prompt(self, prompt_id: str) -> Optional[str]:
+        """Stop a prompt so later jobs do not queue behind it
+
+        Interrupts it if it is executing, or deletes it from the queue if it
+        is still pending. Returns "interrupted", "deleted" or None if the
+        prompt was in neither list.
+        """
+        queue = await self.get_queue()
+        if any(item[1] == prompt_id for item in queue.get('queue_running', [])):
+            # Servers that ignore the body interrupt whatever runs, which is this prompt
+            await self.request('POST', '/interrupt', json_body={"prompt_id": prompt_id})
+            return "interrupted"
+        if any(item[1] == prompt_id for item in queue.get('queue_pending', [])):
+            await self.request('POST', '/queue', json_body={"delete": [prompt_id]})
+            return "deleted"
+        return None
+
+    async def get_image(self, filename: str, subfolder: str, folder_type: str) -> bytes:
+        """Get an image from COMFYUI output"""
+        params = {"filename": filename, "subfolder": subfolder, "type": folder_type}
+        return await self.request('GET', '/view', params)
+
+    async def download_image(self, filename: str, subfolder: str, folder_type: str, dest_path: str) -> int:
+        """Stream an output image straight to disk; returns the byte count"""
+        params = {"filename": filename, "subfolder": subfolder, "type": folder_type}
+        written = 0
+        async with self.stream('GET', '/view', params) as response:
+            with open(dest_path, 'wb') as f:
+                async for piece in response.iter_chunks():
+                    f.write(piece)
+                    written += len(piece)
+        return written
+
+    async def wait_for_completion(self, prompt_id: str, timeout: float = 600, poll_interval: float = 1.0) -> bool:
+        """Poll history until the prompt appears or the timeout passes"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                history = await self.get_history(prompt_id)
+                if prompt_id in history:
+                    return True
+            except (ComfyUIError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                # Retried on the next poll
+                print(f"Error getting history: {e}")
+            await asyncio.sleep(poll_interval)
+        return False
+
+
+def format_error(error: ComfyUIError) -> str:
+    """Human-readable summary of a rejected prompt"""
+    lines = [f"HTTP {error.status}", f"Error details: {error.body[:500]}"]
+    details = error.details
+    if isinstance(details, dict) and isinstance(details.get('error'), dict):
+        lines.append(f"Error message: {details['error'].get('message', 'Unknown error')}")
+    if isinstance(details, dict):
+        node_errors = details.get('node_errors') or (details.get('error') or {}).get('node_errors')
+        if node_errors:
+            lines.append(f"Node errors: {json.dumps(node_errors, indent=2)}")
+    return "\n".join(lines)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model fetcher for COMFYUI
+
+Downloads model files into a content-addressed cache and hardlinks them into
+one or more COMFYUI installs:
+
+- Files already installed with a matching SHA-256 are skipped
+- Interrupted downloads resume with HTTP range requests
+- The SHA-256 is computed while streaming, never by re-reading the download
+- The cache (<cache>/sha256/<digest>) is shared, so every COMFYUI instance
+  links to the same blob instead of holding its own copy
+
+Expected hashes come from the MODELS manifest or, for Hugging Face LFS files,
+from the X-Linked-Etag header on the /resolve/ redirect. The digest of every
+finished download is also recorded per URL in the cache, so files without a
+published hash are still skipped on later runs. Any HTTP server that honours
+Range works; scripts/test_fetch_models.py exercises the fetcher against a
+local stand-in.
+
+Usage:
+    python scripts/fetch_models.py
+    python scripts/fetch_models.py --comfyui ComfyUI --comfyui D:/ComfyUI-2
+    python scripts/fetch_models.py --cache-dir ~/.cache/levels-models
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import socket
+import sys
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import List, Optional
+
+DEFAULT_COMFYUI_DIR = os.path.join(os.path.dirname(__file__), "..", "ComfyUI")
+DEFAULT_CACHE_DIR = os.environ.get(
+    "LEVELS_MODEL_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "levels-models"),
+)
+CHUNK_SIZE = 1 << 20
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass
+class ModelSpec:
+    """A model file and where it goes inside a COMFYUI install"""
+    name: str
+    url: str
+    subdir: str
+    sha256: Optional[str] = None
+
+
+MODELS = [
+    ModelSpec(
+        name="mm_sd_v15_v2.safetensors",
+        url="https://huggingface.co/guoyww/animatediff-motion-adapter-v1-5-2/resolve/main/diffusion_pytorch_model.safetensors",
+        subdir="animatediff_models",
+    ),
+]
+
+
+class FetchError(Exception):
+    """Raised when a download fails or does not match its expected hash"""
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Surface 3xx responses as HTTPError instead of following them"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def resolve_sha256(url: str, timeout: int = 30) -> Optional[str]:
+    """Look up the expected SHA-256 from response headers, if the server publishes it
+
+    Hugging Face sends X-Linked-Etag on the redirect from /resolve/ to its
+    CDN, so the HEAD request is not allowed to follow redirects.
+    """
+    req = urllib.request.Request(url, method="HEAD")
+    opener = urllib.request.build_opener(_NoRedirect)
+    try:
+        with opener.open(req, timeout=timeout) as response:
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        headers = e.headers
+    for header in ("X-Linked-Etag", "ETag"):
+        value = (headers.get(header) or "").strip('"').lower()
+        if value.startswith("w/"):
+            continue
+        if _SHA256_RE.match(value):
+            return value
+    return None
+
+
+class ModelCache:
+    """Content-addressed store of model blobs"""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.blob_dir = os.path.join(self.root, "sha256")
+        self.partial_dir = os.path.join(self.root, "partial")
+        self.url_index_path = os.path.join(self.root, "urls.json")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blob_dir, sha256)
+
+    def has(self, sha256: Optional[str]) -> bool:
+        return bool(sha256) and os.path.exists(self.blob_path(sha256))
+
+    def _url_index(self) -> dict:
+        try:
+            with open(self.url_index_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def known_sha256(self, url: str) -> Optional[str]:
+        """Digest of the last complete download of url, if it is still cached"""
+        sha256 = self._url_index().get(url)
+        return sha256 if self.has(sha256) else None
+
+    def remember(self, url: str, sha256: str):
+        index = self._url_index()
+        index[url] = sha256
+        tmp_path = self.url_index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.url_index_path)
+
+    def _partial_path(self, url: str, sha256: Optional[str]) -> str:
+        key = sha256 or hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.partial_dir, key + ".part")
+
+    def download(self, url: str, sha256: Optional[str] = None, timeout: int = 60) -> str:
+        """Download url into the cache, resuming any partial file; returns the blob path"""
+        if self.has(sha256):
+            return self.blob_path(sha256)
+
+        part_path = self._partial_path(url, sha256)
+        digest = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part_path):
+            # Seed the running hash with what is already on disk
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    offset += len(chunk)
+
+        req = urllib.request.Request(url)
+        if offset:
+            req.add_header("Range", f"bytes={offset}-")
+
+        try:
+            response = urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # Partial file already holds the whole body
+                response = None
+            else:
+                raise FetchError(f"HTTP {e.code} fetching {url}") from e
+        except urllib.error.URLError as e:
+            raise FetchError(f"Cannot reach {url}: {e.reason}") from e
+        except (socket.timeout, ConnectionError) as e:
+            raise FetchError(f"Cannot reach {url}: {e}") from e
+
+        # Only a body known to be complete may be discarded on a hash mismatch;
+        # anything shorter is kept so the next run resumes it
+        complete = response is None
+        if response is not None:
+            with response:
+                if offset and response.status != 206:
+                    # Server ignored the range request: start over
+                    print("  Server does not support resume, restarting download")
+                    digest = hashlib.sha256()
+                    offset = 0
+                mode = 'ab' if offset else 'wb'
+                total = response.headers.get("Content-Length")
+                total = int(total) + offset if total else None
+                if offset:
+                    print(f"  Resuming at {offset / 1e6:.1f} MB")
+                received = offset
+                try:
+                    with open(part_path, mode) as f:
+                        for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            received += len(chunk)
+                            if total:
+                                print(f"\r  {received / 1e6:.1f} / {total / 1e6:.1f} MB", end="", flush=True)
+                except (socket.timeout, ConnectionError, http.client.IncompleteRead) as e:
+                    print()
+                    raise FetchError(f"Connection lost at {received / 1e6:.1f} MB: {e}") from e
+                if total:
+                    print()
+                if total is not None and received < total:
+                    raise FetchError(f"Download interrupted at {received / 1e6:.1f} of {total / 1e6:.1f} MB")
+                complete = total is not None
+
+        actual = digest.hexdigest()
+        if sha256 and actual != sha256:
+            if complete:
+                os.remove(part_path)
+            raise FetchError(f"SHA-256 mismatch for {url}: expected {sha256}, got {actual}")
+
+        blob = self.blob_path(actual)
+        os.replace(part_path, blob)
+        self.remember(url, actual)
+        return blob
+
+
+def install(blob: str, dest: str):
+    """Hardlink a cached blob to dest, copying if the link crosses filesystems"""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp = dest + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, dest)
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def fetch_model(spec: ModelSpec, comfyui_dirs: List[str], cache: ModelCache) -> bool:
+    """Make sure spec is installed in every COMFYUI dir; returns True on success"""
+    print(f"\n{spec.name}")
+    sha256 = spec.sha256
+    if sha256 is None:
+        try:
+            sha256 = resolve_sha256(spec.url)
+        except (urllib.error.URLError, OSError):
+            sha256 = None
+    if sha256 is None:
+        # Digest recorded by an earlier complete download of the same URL
+        sha256 = cache.known_sha256(spec.url)
+        if sha256 is None:
+            print("  [WARN] No published SHA-256; the download will not be verified")
+
+    dests = [os.path.join(d, "models", spec.subdir, spec.name) for d in comfyui_dirs]
+    blob = cache.blob_path(sha256) if cache.has(sha256) else None
+
+    pending = []
+    for dest in dests:
+        if not os.path.exists(dest):
+            pending.append(dest)
+        elif blob and _same_file(blob, dest):
+            print(f"  [SKIP] {dest} (linked to cache)")
+        elif sha256 and sha256_file(dest) == sha256:
+            print(f"  [SKIP] {dest} (hash matches)")
+            if blob is None:
+                # Adopt the verified file as the cache blob instead of downloading it again
+                blob = cache.blob_path(sha256)
+                install(dest, blob)
+        else:
+            pending.append(dest)
+
+    if not pending:
+        return True
+
+    if blob is None:
+        try:
+            print(f"  Downloading {spec.url}")
+            blob = cache.download(spec.url, sha256)
+        except FetchError as e:
+            print(f"  [ERROR] {e}")
+            return False
+
+    for dest in pending:
+        install(blob, dest)
+        print(f"  [OK] {dest}")
+    return True
+
+
+def main():
+    # Fix Windows console encoding (here rather than at import: download_animatediff_model.py imports this module)
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+    parser = argparse.ArgumentParser(description="Fetch COMFYUI models into a shared, verified cache")
+    parser.add_argument("--comfyui", action="append", dest="comfyui_dirs",
+                        help="COMFYUI install to link models into (repeatable)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Content-addressed model cache")
+    parser.add_argument("--only", action="append", help="Fetch only these model names")
+    args = parser.parse_args()
+
+    comfyui_dirs = [os.path.abspath(d) for d in (args.comfyui_dirs or [DEFAULT_COMFYUI_DIR])]
+    cache = ModelCache(args.cache_dir)
+    models = [m for m in MODELS if not args.only or m.name in args.only]
+
+    print(f"Cache: {cache.root}")
+    print(f"COMFYUI installs: {', '.join(comfyui_dirs)}")
+
+    failed = [m.name for m in models if not fetch_model(m, comfyui_dirs, cache)]
+    if failed:
+        print(f"\n[ERROR] Failed: {', '.join(failed)}")
+        print("Re-run to resume interrupted downloads.")
+        sys.exit(1)
+    print(f"\n[OK] {len(models)} model(s) ready")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,214 +11,76 @@ Requirements:
 
 Usage:
     python scripts/generate_comfyui_animations.py
+    python scripts/generate_comfyui_animations.py --only power-vs-force --only 'levels-*'
+    python scripts/generate_comfyui_animations.py --exclude 'music-*' --jobs 2 \
+        --server http://127.0.0.1:8188 --server http://gpu-box:8188
+    python scripts/generate_comfyui_animations.py --only desire-black-hole --dry-run
 """
 
+import argparse
+import asyncio
+import fnmatch
 import json
-import urllib.request
-import urllib.parse
-import time
 import os
 import sys
 from typing import Dict, List, Optional
 
-# Fix Windows console encoding
-if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
-
-# COMFYUI API endpoint
-COMFYUI_URL = "http://127.0.0.1:8188"
-
-# Animation configurations
-ANIMATIONS = {
-    "desire-black-hole": {
-        "prompt": "A mesmerizing black hole in deep space, purple and dark blue accretion disk rotating around a dark center, particles spiraling inward in a vortex, glowing energy trails, cosmic dust, ethereal purple and blue light, smooth rotation, loop animation, spiritual and mystical atmosphere, high contrast, vibrant colors",
-        "negative": "static image, still frame, low quality, blurry, pixelated, distorted, choppy animation",
-        "frames": 120,
-        "fps": 24,
-        "width": 512,
-        "height": 512,
-    },
-    "power-vs-force": {
-        "prompt": "Two contrasting energy flows side by side: left side shows chaotic red force energy pushing against a wall, particles bouncing and scattering, exhausting movement. Right side shows smooth blue power energy flowing effortlessly like water, gentle waves, harmonious motion, peaceful and effortless, smooth transitions, loop animation",
-        "negative": "static, still, low quality, blurry, choppy animation, abrupt transitions",
-        "frames": 90,
-        "fps": 24,
-        "width": 512,
-        "height": 256,
-    },
-    "natural-happiness": {
-        "prompt": "A beautiful sky scene with fluffy white clouds drifting slowly, bright sun shining through, warm golden light, peaceful blue sky, clouds moving gently, sun pulsing softly with warm glow, serene and calming atmosphere, smooth cloud movement, loop animation, spiritual and peaceful",
-        "negative": "dark, stormy, chaotic, low quality, blurry, static, harsh lighting",
-        "frames": 100,
-        "fps": 24,
-        "width": 512,
-        "height": 384,
-    },
-    "energy-leak": {
-        "prompt": "Energy flowing upward like a fountain, blocked by gray emotional barriers, energy leaking out in curved streams, glowing green energy particles escaping, barriers dissolving when energy flows through, smooth particle trails, loop animation, spiritual energy visualization",
-        "negative": "static, choppy, low quality, blurry, pixelated, straight lines",
-        "frames": 110,
-        "fps": 24,
-        "width": 512,
-        "height": 512,
-    },
-    "knowledge-vs-practice": {
-        "prompt": "Left side: static books stacked, knowledge represented as still books. Right side: dynamic circle pulsing with energy, ripples expanding outward, particles radiating, active and alive, smooth pulsing motion, loop animation, contrasting static vs dynamic",
-        "negative": "static, still, low quality, blurry, choppy, synchronized movement",
-        "frames": 80,
-        "fps": 24,
-        "width": 512,
-        "height": 256,
-    },
-    "levels-of-truth": {
-        "prompt": "Four independent glowing circles arranged in space, each pulsing at different rhythms, connected by subtle energy lines, purple and blue glowing orbs, each representing a different level of truth, smooth pulsing animations, independent but connected, loop animation, spiritual and mystical",
-        "negative": "static, synchronized, low quality, blurry, uniform pulsing",
-        "frames": 100,
-        "fps": 24,
-        "width": 512,
-        "height": 512,
-    },
-    "reprogramming-transition": {
-        "prompt": "Old programming represented as fading gray box shrinking, new programming as glowing purple box growing and expanding, particles transitioning between them, smooth morphing transition, transformation animation, loop animation, spiritual reprogramming visualization",
-        "negative": "static, abrupt transition, low quality, blurry, choppy morphing",
-        "frames": 90,
-        "fps": 24,
-        "width": 512,
-        "height": 256,
-    },
-    "resistance-flow": {
-        "prompt": "Two energy bars side by side: left shows red resistance block pushing against wall with squash and stretch, exhausting movement. Right shows blue flow block moving smoothly, glowing with energy, effortless motion, smooth transitions, loop animation, contrasting resistance vs flow",
-        "negative": "static, choppy, low quality, blurry, rigid movement",
-        "frames": 85,
-        "fps": 24,
-        "width": 512,
-        "height": 256,
-    },
-    "intention-ripple": {
-        "prompt": "Center point pulsing with purple glow, expanding ripple waves radiating outward, awareness indicators appearing around the ripples, smooth expanding circles, glowing particles, spiritual intention visualization, loop animation, peaceful and focused",
-        "negative": "static, choppy, low quality, blurry, chaotic ripples",
-        "frames": 95,
-        "fps": 24,
-        "width": 512,
-        "height": 512,
-    },
-    "music-vibration": {
-        "prompt": "Two sets of audio waves: left side shows chaotic red high-frequency waves, irregular and jarring. Right side shows smooth blue harmonious waves, flowing and peaceful, contrasting anger-based vs classical music, smooth wave animations, loop animation",
-        "negative": "static, still, low quality, blurry, synchronized waves",
-        "frames": 100,
-        "fps": 24,
-        "width": 512,
-        "height": 256,
-    },
-    "spiritual-progress-spiral": {
-        "prompt": "Spiral path traced through space, glowing dot moving along the spiral with vertical oscillation showing ups and downs, purple energy trail, non-linear spiritual progress visualization, smooth spiral motion, loop animation, mystical and spiritual",
-        "negative": "linear, straight, static, low quality, blurry, uniform motion",
-        "frames": 120,
-        "fps": 24,
-        "width": 512,
-        "height": 512,
-    },
-    "addiction-cloud": {
-        "prompt": "Sky scene with sun always shining, clouds appearing and disappearing, drug effect temporarily clears clouds, withdrawal brings thicker clouds back, sun pulsing gently, smooth cloud transitions, loop animation, spiritual metaphor for addiction",
-        "negative": "static, choppy, low quality, blurry, harsh transitions",
-        "frames": 110,
-        "fps": 24,
-        "width": 512,
-        "height": 384,
-    },
-    "reaction-vs-power": {
-        "prompt": "Two circles: left shows red reaction circle bouncing when triggered, losing power and fading. Right shows blue power circle stable and radiating energy outward, maintaining power, smooth animations, loop animation, contrasting reaction vs power",
-        "negative": "static, choppy, low quality, blurry, synchronized movement",
-        "frames": 90,
-        "fps": 24,
-        "width": 512,
-        "height": 256,
-    },
-    "body-mind-spirit-layers": {
-        "prompt": "Three horizontal layers stacked: body layer (red tension transitioning to green relaxation), mind layer (red tension to green relaxation), spirit layer (red tension to green relaxation), letting go indicator appearing, smooth layer-by-layer relaxation, loop animation, spiritual healing visualization",
-        "negative": "static, choppy, low quality, blurry, abrupt transitions",
-        "frames": 100,
-        "fps": 24,
-        "width": 512,
-        "height": 384,
-    },
-    "shadow-illumination": {
-        "prompt": "Dark shadow circle in center, acknowledgment indicator appears, then golden light expands and illuminates the shadow, shadow shrinks and fades as light grows, smooth illumination transition, loop animation, spiritual shadow work visualization",
-        "negative": "static, abrupt, low quality, blurry, harsh lighting",
-        "frames": 95,
-        "fps": 24,
-        "width": 512,
-        "height": 512,
-    },
-    "fear-grief-spill": {
-        "prompt": "Container filling with accumulated fear/grief energy (red/orange), energy spilling out into life experiences, spill effect flowing, life experience indicators appearing, smooth filling and spilling animation, loop animation, spiritual emotional processing",
-        "negative": "static, choppy, low quality, blurry, abrupt flow",
-        "frames": 105,
-        "fps": 24,
-        "width": 512,
-        "height": 384,
-    },
-    "emotional-stack-collapse": {
-        "prompt": "Stack of emotional layers collapsing from bottom up, energy release from bottom, layers dissolving as they collapse, smooth collapse animation, loop animation, spiritual emotional release visualization",
-        "negative": "static, choppy, low quality, blurry, abrupt collapse",
-        "frames": 100,
-        "fps": 24,
-        "width": 512,
-        "height": 384,
-    },
-}
-
-
-def queue_prompt(prompt: Dict) -> Dict:
+from comfyui_client import COMFYUI_URL, ComfyUIClient, ComfyUIError, format_error
+from job_planner import checkpoint_of, count_switches, motion_model_of, negative_of, plan_jobs
+from render_cost import (DEFAULT_STEPS, DEFAULT_TIMEOUT, CostModel, format_duration, job_units, server_key,
+                         timeout_for)
+
+try:
+    # All need numpy and Pillow
+    import render_archive
+    import render_export
+    import render_qa
+except ImportError:
+    render_archive = None
+    render_export = None
+    render_qa = None
+
+DEFAULT_SEED = 12345
+
+# Takes failing render QA are re-rendered with seed + attempt * QA_SEED_STRIDE
+QA_MAX_ATTEMPTS = 3
+QA_SEED_STRIDE = 1000003
+
+# Animation catalog: name -> prompt, negative, frames, fps, width, height
+# (optional: seed, steps, checkpoint, motion_model, qa)
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "animations.json")
+
+
+def load_catalog(path: str = CATALOG_PATH) -> Dict[str, Dict]:
+    """Load the animation catalog from its JSON data file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+ANIMATIONS = load_catalog()
+
+
+async def queue_prompt(client: ComfyUIClient, prompt: Dict) -> Dict:
     """Queue a prompt in COMFYUI and return the response"""
-    p = {"prompt": prompt}
-    data = json.dumps(p).encode('utf-8')
-    req = urllib.request.Request(f"{COMFYUI_URL}/prompt", data=data, headers={'Content-Type': 'application/json'})
-    
     try:
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read())
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        print(f"Error queueing prompt: HTTP {e.code}")
-        print(f"Error details: {error_body}")
-        try:
-            error_json = json.loads(error_body)
-            if 'error' in error_json:
-                print(f"Error message: {error_json.get('error', {}).get('message', 'Unknown error')}")
-                if 'node_errors' in error_json.get('error', {}):
-                    print(f"Node errors: {json.dumps(error_json['error']['node_errors'], indent=2)}")
-        except:
-            pass
+        return await client.queue_prompt(prompt)
+    except ComfyUIError as e:
+        print(f"Error queueing prompt: {format_error(e)}")
         raise
     except Exception as e:
         print(f"Error queueing prompt: {e}")
         raise
 
 
-def get_history(prompt_id: str) -> Optional[Dict]:
-    """Get the history for a prompt ID"""
+async def cancel_prompt(client: ComfyUIClient, prompt_id: str):
+    """Cancel a timed-out prompt so it does not hold up the jobs queued after it"""
     try:
-        with urllib.request.urlopen(f"{COMFYUI_URL}/history/{prompt_id}") as response:
-            return json.loads(response.read())
-    except Exception as e:
-        print(f"Error getting history: {e}")
-        return None
-
-
-def get_image(filename: str, subfolder: str, folder_type: str) -> bytes:
-    """Get an image from COMFYUI output"""
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    try:
-        with urllib.request.urlopen(f"{COMFYUI_URL}/view?{url_values}") as response:
-            return response.read()
-    except Exception as e:
-        print(f"Error getting image: {e}")
-        raise
+        outcome = await client.cancel_prompt(prompt_id)
+    except (ComfyUIError, OSError, asyncio.TimeoutError) as e:
+        print(f"[WARN] Could not cancel prompt {prompt_id}: {e}")
+        return
+    if outcome:
+        print(f"Cancelled prompt {prompt_id} ({outcome})")
 
 
 def create_workflow(animation_name: str, config: Dict) -> Dict:
@@ -260,7 +122,7 @@ def create_workflow(animation_name: str, config: Dict) -> Dict:
     # Node 2: CLIP Text Encode (Negative)
     workflow["2"] = {
         "inputs": {
-            "text": config.get('negative', 'static image, still frame, low quality, blurry, pixelated, distorted'),
+            "text": negative_of(config),
             "clip": ["3", 1]
         },
         "class_type": "CLIPTextEncode"
@@ -269,7 +131,7 @@ def create_workflow(animation_name: str, config: Dict) -> Dict:
     # Node 3: Checkpoint Loader
     workflow["3"] = {
         "inputs": {
-            "ckpt_name": "v1-5-pruned-emaonly.safetensors"  # Adjust to your model
+            "ckpt_name": checkpoint_of(config)  # Override per animation with "checkpoint"
         },
         "class_type": "CheckpointLoaderSimple"
     }
@@ -277,7 +139,7 @@ def create_workflow(animation_name: str, config: Dict) -> Dict:
     # Node 4: Load AnimateDiff Model
     workflow["4"] = {
         "inputs": {
-            "model_name": "mm_sd_v15_v2.ckpt",
+            "model_name": motion_model_of(config),
             "beta_schedule": "autoselect"
         },
         "class_type": "ADE_LoadAnimateDiffModel"
@@ -295,8 +157,8 @@ def create_workflow(animation_name: str, config: Dict) -> Dict:
     # Node 6: KSampler
     workflow["6"] = {
         "inputs": {
-            "seed": 12345,
-            "steps": 20,
+            "seed": config.get('seed', DEFAULT_SEED),
+            "steps": config.get('steps', DEFAULT_STEPS),
             "cfg": 7.0,
             "sampler_name": "euler",
             "scheduler": "normal",
@@ -340,150 +202,364 @@ def create_workflow(animation_name: str, config: Dict) -> Dict:
     return workflow
 
 
-def wait_for_completion(prompt_id: str, timeout: int = 600) -> bool:
-    """Wait for a prompt to complete"""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        history = get_history(prompt_id)
-        if history and prompt_id in history:
-            return True
-        time.sleep(1)
-    return False
+def get_execution_time(history_entry: Dict) -> Optional[float]:
+    """Server-side execution time in seconds from a history entry's status messages"""
+    timestamps = {}
+    for message in history_entry.get('status', {}).get('messages', []):
+        if len(message) == 2 and isinstance(message[1], dict) and 'timestamp' in message[1]:
+            timestamps[message[0]] = message[1]['timestamp']
+    if 'execution_start' in timestamps and 'execution_success' in timestamps:
+        # COMFYUI reports milliseconds
+        return (timestamps['execution_success'] - timestamps['execution_start']) / 1000.0
+    return None
+
+
+def get_output_images(history_entry: Dict) -> List[Dict]:
+    """Image records ({filename, subfolder, type}) from a history entry, in frame order"""
+    images = []
+    for output in history_entry.get('outputs', {}).values():
+        images.extend(output.get('images', []))
+    return sorted(images, key=lambda image: image['filename'])
+
+
+async def render_take(client: ComfyUIClient, animation_name: str, config: Dict, timeout: int) -> Optional[Dict]:
+    """Queue one take and wait for it; returns its history entry, or None on failure"""
+    workflow = create_workflow(animation_name, config)
+
+    # Queue prompt - COMFYUI expects {"prompt": workflow}
+    result = await queue_prompt(client, workflow)
+    prompt_id = result.get('prompt_id') if isinstance(result, dict) else None
+    if not prompt_id:
+        print(f"[ERROR] No prompt_id returned. Response: {result}")
+        print(f"Workflow structure: {json.dumps(workflow, indent=2)[:500]}...")
+        return None
+    print(f"Queued with ID: {prompt_id} (seed {config.get('seed', DEFAULT_SEED)})")
+
+    # Wait for completion
+    print("Waiting for generation to complete...")
+    if not await client.wait_for_completion(prompt_id, timeout=timeout):
+        print(f"[ERROR] Timeout waiting for {animation_name} after {format_duration(timeout)}")
+        await cancel_prompt(client, prompt_id)
+        return None
+
+    history = await client.get_history(prompt_id)
+    if prompt_id not in history:
+        print(f"[ERROR] No history for {animation_name}")
+        return None
+    return history[prompt_id]
+
+
+async def download_frames(client: ComfyUIClient, history_entry: Dict) -> List[bytes]:
+    """Fetch all output frames of a take concurrently over the pooled connections"""
+    images = get_output_images(history_entry)
+    return await asyncio.gather(*(
+        client.get_image(image['filename'], image['subfolder'], image['type']) for image in images
+    ))
+
+
+async def check_take(client: ComfyUIClient, animation_name: str, config: Dict, history_entry: Dict):
+    """Download a take's frames and run the QA gate; returns (frame stack, QA result)"""
+    images = await download_frames(client, history_entry)
+    if not images:
+        print(f"[ERROR] No output frames for {animation_name}")
+        return None, None
 
+    # Decoding and QA are CPU-bound: keep them off the event loop so other jobs keep polling
+    frames = await asyncio.to_thread(render_qa.decode_frames, images)
+    result = await asyncio.to_thread(render_qa.evaluate, frames, render_qa.QAThresholds.from_config(config))
+    if result.passed:
+        print(f"[OK] QA passed ({len(frames)} frames)")
+    else:
+        for reason in result.reasons:
+            print(f"[QA] {reason}")
+    return frames, result
 
-def generate_animation(animation_name: str, config: Dict, output_dir: str = "assets/animations"):
-    """Generate a single animation"""
+
+def archive_take(archive, animation_name: str, config: Dict, frames, result):
+    """Keep every take, passed or not, in the deduplicated render archive"""
+    meta = {
+        "seed": config.get('seed', DEFAULT_SEED),
+        "qa_passed": result.passed,
+        "qa": result.summary,
+        "prompt": config['prompt'],
+    }
+    index = archive.add_take(animation_name, frames, meta)
+    print(f"Archived take {index['take']} ({index['stored_bytes'] / 1e6:.1f} MB new, "
+          f"{index['raw_bytes'] / 1e6:.1f} MB raw)")
+
+
+async def generate_animation(client: ComfyUIClient, animation_name: str, config: Dict,
+                             output_dir: str = "assets/animations", timeout: int = DEFAULT_TIMEOUT,
+                             estimate: Optional[float] = None, archive=None,
+                             render_lock: Optional[asyncio.Lock] = None):
+    """Generate a single animation, re-rendering with a new seed while QA fails
+
+    render_lock is held from queueing a take until it completes, so jobs
+    sharing a server never wait in its queue while their timeout runs.
+    """
     print(f"\n{'='*60}")
     print(f"Generating: {animation_name}")
     print(f"{'='*60}")
     print(f"Frames: {config['frames']}, Size: {config['width']}x{config['height']}")
+    if estimate is not None:
+        print(f"ETA: {format_duration(estimate)} (timeout {format_duration(timeout)})")
     print(f"Prompt: {config['prompt'][:100]}...")
-    
-    # Create workflow
-    workflow = create_workflow(animation_name, config)
-    
-    # Queue prompt - COMFYUI expects {"prompt": workflow}
+
+    attempts = QA_MAX_ATTEMPTS if render_qa else 1
+    render_lock = render_lock or asyncio.Lock()
+    base_seed = config.get('seed', DEFAULT_SEED)
     try:
-        result = queue_prompt(workflow)
-        prompt_id = result.get('prompt_id') if isinstance(result, dict) else None
-        if not prompt_id:
-            print(f"[ERROR] No prompt_id returned. Response: {result}")
-            print(f"Workflow structure: {json.dumps(workflow, indent=2)[:500]}...")
-            return False
-        print(f"Queued with ID: {prompt_id}")
-        
-        # Wait for completion
-        print("Waiting for generation to complete...")
-        if wait_for_completion(prompt_id, timeout=1800):  # 30 min timeout
+        for attempt in range(attempts):
+            take_config = dict(config, seed=base_seed + attempt * QA_SEED_STRIDE)
+            if attempt:
+                print(f"Re-queueing {animation_name} (attempt {attempt + 1}/{attempts})")
+
+            async with render_lock:
+                history_entry = await render_take(client, animation_name, take_config, timeout)
+            if history_entry is None:
+                return False
             print(f"[OK] Generation complete for {animation_name}")
-            
-            # Get output files
-            history = get_history(prompt_id)
-            if history and prompt_id in history:
-                outputs = history[prompt_id]['outputs']
-                # Process outputs and save video
-                # Note: You'll need to convert images to video using ffmpeg or similar
+
+            if render_qa is None:
                 print(f"[OK] Outputs available for {animation_name}")
                 return True
-        else:
-            print(f"[ERROR] Timeout waiting for {animation_name}")
-            return False
-            
+
+            frames, result = await check_take(client, animation_name, take_config, history_entry)
+            if frames is None:
+                return False
+            if archive is not None:
+                await asyncio.to_thread(archive_take, archive, animation_name, take_config, frames, result)
+            if result.passed:
+                entry = await asyncio.to_thread(render_export.export_animation, animation_name, frames,
+                                                output_dir, config.get('fps', 24))
+                # Manifest read-modify-write stays on the loop so workers never race on it
+                render_export.update_manifest(output_dir, animation_name, entry)
+                render_export.print_entry(animation_name, entry)
+                return True
+
+        print(f"[ERROR] {animation_name} failed QA after {attempts} attempts")
+        return False
+
     except Exception as e:
         print(f"[ERROR] Error generating {animation_name}: {e}")
         return False
 
 
-def convert_images_to_video(image_dir: str, output_path: str, fps: int = 24):
-    """Convert image sequence to MP4 video using ffmpeg"""
-    import subprocess
-    
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Use ffmpeg to create video from images
-    cmd = [
-        "ffmpeg",
-        "-y",  # Overwrite output file
-        "-framerate", str(fps),
-        "-i", f"{image_dir}/%05d.png",  # Input pattern
-        "-c:v", "libx264",
-        "-pix_fmt", "yuv420p",
-        "-crf", "23",  # Quality (lower = better, 18-28 is good range)
-        "-preset", "medium",
-        "-loop", "1",  # Loop once for seamless playback
-        output_path
-    ]
-    
+def select_animations(catalog: Dict[str, Dict], only: Optional[List[str]] = None,
+                      exclude: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Filter the catalog by names or glob patterns (comma-separated lists allowed)"""
+    def patterns(values):
+        return [p.strip() for value in values or [] for p in value.split(',') if p.strip()]
+
+    include, skip = patterns(only), patterns(exclude)
+    for pattern in include + skip:
+        if not any(fnmatch.fnmatchcase(name, pattern) for name in catalog):
+            print(f"[WARN] No animation matches '{pattern}'")
+
+    return {
+        name: config for name, config in catalog.items()
+        if (not include or any(fnmatch.fnmatchcase(name, p) for p in include))
+        and not any(fnmatch.fnmatchcase(name, p) for p in skip)
+    }
+
+
+def print_dry_run(plan: List, cost_model: Optional[CostModel]):
+    """Print each planned graph and its estimated cost without contacting a server"""
+    total = 0.0
+    for animation_name, config in plan:
+        print(f"\n--- {animation_name} ({config['width']}x{config['height']}, {config['frames']} frames) ---")
+        if cost_model:
+            estimate = cost_model.estimate(config)
+            total += estimate
+            print(f"Estimated: {format_duration(estimate)} (timeout {format_duration(cost_model.timeout_for(config))})")
+        else:
+            units = job_units(config)
+            total += units
+            print(f"Work: {units / 1e9:.2f} G pixel-frame-steps")
+        print(json.dumps(create_workflow(animation_name, config), indent=2))
+
+    print("\n" + "="*60)
+    if cost_model:
+        print(f"Estimated total render time: {format_duration(total)}")
+    else:
+        print(f"Total work: {total / 1e9:.2f} G pixel-frame-steps (run test_comfyui.py --probe for times)")
+
+
+def planning_model(cost_models: Dict[str, Optional[CostModel]]) -> Optional[CostModel]:
+    """Any probed server's model; only relative job costs matter for ordering"""
+    return next((model for model in cost_models.values() if model), None)
+
+
+async def run_all(clients: List[ComfyUIClient], animations: Dict[str, Dict], output_dir: str,
+                  cost_models: Dict[str, Optional[CostModel]], jobs: int = 1, archive=None) -> Dict[str, bool]:
+    """Generate animations in plan order with up to `jobs` in flight, spread over the servers
+
+    Each server renders one take at a time; jobs beyond the number of servers
+    download, check and export a finished take while the next one renders.
+    Timeouts and ETAs come from each server's own cost model (cost_models is
+    keyed by server URL); unprobed servers get DEFAULT_TIMEOUT.
+    """
+    # Group jobs so model loads and latent reallocations happen once per group
+    plan = plan_jobs(animations, planning_model(cost_models))
+    switches = count_switches(plan)
+    print(f"Plan: {switches['checkpoint_loads']} checkpoint load(s), "
+          f"{switches['motion_model_loads']} motion model load(s), "
+          f"{switches['shape_changes']} latent shape change(s)")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in plan:
+        queue.put_nowait(job)
+    results: Dict[str, bool] = {}
+    render_locks = {client: asyncio.Lock() for client in clients}
+
+    async def worker(client: ComfyUIClient):
+        while not queue.empty():
+            animation_name, config = queue.get_nowait()
+            cost_model = cost_models.get(server_key(client.base_url))
+            estimate = cost_model.estimate(config) if cost_model else None
+            success = await generate_animation(client, animation_name, config, output_dir,
+                                               timeout=timeout_for(cost_model, config), estimate=estimate,
+                                               archive=archive, render_lock=render_locks[client])
+            results[animation_name] = success
+
+            # Small delay between animations
+            if success:
+                await asyncio.sleep(2)
+
+    await asyncio.gather(*(worker(clients[i % len(clients)]) for i in range(max(1, jobs))))
+
+    return {name: results[name] for name, _ in plan}
+
+
+async def check_server(client: ComfyUIClient) -> bool:
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        print(f"✓ Video created: {output_path}")
+        await client.system_stats()
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Error creating video: {e}")
-        print(f"  stdout: {e.stdout.decode()}")
-        print(f"  stderr: {e.stderr.decode()}")
-        return False
-    except FileNotFoundError:
-        print("✗ ffmpeg not found. Please install ffmpeg to convert images to video.")
+    except (ComfyUIError, OSError, asyncio.TimeoutError):
         return False
 
 
-def main():
-    """Main function to generate all animations"""
+async def main_async(args):
+    """Main function to generate the selected animations"""
+    animations = select_animations(load_catalog(args.catalog), args.only, args.exclude)
+    if args.checkpoint or args.motion_model:
+        for name, config in animations.items():
+            config = dict(config)
+            if args.checkpoint:
+                config.setdefault('checkpoint', args.checkpoint)
+            if args.motion_model:
+                config.setdefault('motion_model', args.motion_model)
+            animations[name] = config
+
     print("="*60)
     print("COMFYUI Animation Generator for Levels4")
     print("="*60)
-    print(f"COMFYUI URL: {COMFYUI_URL}")
-    print(f"Total animations: {len(ANIMATIONS)}")
-    
-    # Check if COMFYUI is running
-    try:
-        urllib.request.urlopen(f"{COMFYUI_URL}/system_stats", timeout=5)
-        print("[OK] COMFYUI is running")
-    except Exception as e:
-        print(f"[ERROR] Cannot connect to COMFYUI at {COMFYUI_URL}")
+    print(f"COMFYUI URL(s): {', '.join(args.server)}")
+    print(f"Selected animations: {len(animations)}")
+    if not animations:
+        print("[ERROR] Nothing to generate")
+        sys.exit(1)
+    if render_qa is None:
+        print("[WARN] numpy/Pillow not installed; render QA and export are disabled")
+
+    # Each server is timed by its own profile
+    cost_models = {server_key(url): CostModel.load(url) for url in args.server}
+    if args.dry_run:
+        cost_model = planning_model(cost_models)
+        if cost_model:
+            print(f"Estimates use the profile of {cost_model.server}")
+        print_dry_run(plan_jobs(animations, cost_model), cost_model)
+        return
+
+    for url, cost_model in cost_models.items():
+        if cost_model:
+            total = sum(cost_model.estimate(config) for config in animations.values())
+            print(f"Estimated total render time on {url}: {format_duration(total)}")
+        else:
+            print(f"No render profile for {url}; using a flat {format_duration(DEFAULT_TIMEOUT)} timeout")
+            print(f"  Run: python scripts/test_comfyui.py --probe --server {url}")
+
+    # Check which COMFYUI servers are running
+    clients = []
+    for url in args.server:
+        client = ComfyUIClient(url)
+        if await check_server(client):
+            print(f"[OK] COMFYUI is running at {url}")
+            clients.append(client)
+        else:
+            print(f"[ERROR] Cannot connect to COMFYUI at {url}")
+    if not clients:
         print("  Please ensure COMFYUI is running:")
         print("  1. Start COMFYUI: python main.py")
         print("  2. Wait for it to fully load")
         print("  3. Run this script again")
-        print(f"\n  If COMFYUI is on a different port, edit COMFYUI_URL in the script")
+        print(f"\n  If COMFYUI is on a different port, pass --server http://host:port")
         sys.exit(1)
-    
+
     # Create output directory
-    output_dir = "assets/animations"
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
-    
+
     # Generate each animation
-    results = {}
-    for animation_name, config in ANIMATIONS.items():
-        success = generate_animation(animation_name, config, output_dir)
-        results[animation_name] = success
-        
-        # Small delay between animations
-        if success:
-            time.sleep(2)
-    
+    try:
+        archive = None
+        if render_archive is not None and not args.no_archive:
+            archive = render_archive.RenderArchive(args.archive_dir)
+        results = await run_all(clients, animations, output_dir, cost_models, jobs=args.jobs, archive=archive)
+    finally:
+        for client in clients:
+            await client.close()
+
     # Summary
     print("\n" + "="*60)
     print("Generation Summary")
     print("="*60)
     successful = sum(1 for v in results.values() if v)
     failed = len(results) - successful
-    
-    print(f"Successful: {successful}/{len(ANIMATIONS)}")
-    print(f"Failed: {failed}/{len(ANIMATIONS)}")
-    
+
+    print(f"Successful: {successful}/{len(results)}")
+    print(f"Failed: {failed}/{len(results)}")
+
     if failed > 0:
         print("\nFailed animations:")
         for name, success in results.items():
             if not success:
                 print(f"  - {name}")
-    
+
     print(f"\nOutput directory: {output_dir}")
-    print("Note: You may need to convert image sequences to MP4 using ffmpeg")
+    if render_export is None:
+        print("Note: Install numpy and Pillow to export MP4/WebP/sprite sheets automatically")
+
+
+def main():
+    # Fix Windows console encoding (here rather than at import: test_comfyui.py imports this module)
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+    parser = argparse.ArgumentParser(description="Generate app animations with COMFYUI")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="Animation catalog JSON")
+    parser.add_argument("--only", action="append", metavar="NAME",
+                        help="Only these animations (name or glob, repeatable or comma-separated)")
+    parser.add_argument("--exclude", action="append", metavar="NAME",
+                        help="Skip these animations (name or glob, repeatable or comma-separated)")
+    parser.add_argument("--jobs", type=int, default=1, help="Animations in flight at once (each server renders one at a time)")
+    parser.add_argument("--server", action="append", metavar="URL",
+                        help=f"COMFYUI URL, repeatable to spread jobs (default: {COMFYUI_URL})")
+    parser.add_argument("--output-dir", default="assets/animations", help="Where exports are written")
+    parser.add_argument("--archive-dir", default=os.path.join(os.path.dirname(__file__), "..", "renders", "archive"),
+                        help="Deduplicated archive of every rendered take")
+    parser.add_argument("--no-archive", action="store_true", help="Do not archive takes")
+    parser.add_argument("--checkpoint", help="Checkpoint for animations that do not set one")
+    parser.add_argument("--motion-model", help="Motion model for animations that do not set one")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the planned graphs and estimated cost, then exit")
+    args = parser.parse_args()
+    args.server = args.server or [COMFYUI_URL]
+
+    asyncio.run(main_async(args))
 
 
 if __name__ == "__main__":
     main()
-
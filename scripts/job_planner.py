@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Job ordering for COMFYUI batches
+
+COMFYUI keeps loaded models and cached node outputs between prompts, but only
+for as long as the next prompt asks for the same thing. Running jobs in
+catalog order makes the server reload models and re-plan latent shapes far
+more often than needed, so jobs are grouped by
+
+    (checkpoint, motion model, width, height, frames)
+
+and ordered so that each model swap and each latent reallocation happens once
+per group. Inside a group, jobs sharing a negative prompt run back to back so
+its text encoding is served from the server's cache.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from render_cost import CostModel, job_units
+
+DEFAULT_CHECKPOINT = "v1-5-pruned-emaonly.safetensors"
+DEFAULT_MOTION_MODEL = "mm_sd_v15_v2.ckpt"
+DEFAULT_NEGATIVE = "static image, still frame, low quality, blurry, pixelated, distorted"
+
+Job = Tuple[str, Dict]
+
+
+def checkpoint_of(config: Dict) -> str:
+    return config.get('checkpoint', DEFAULT_CHECKPOINT)
+
+
+def motion_model_of(config: Dict) -> str:
+    return config.get('motion_model', DEFAULT_MOTION_MODEL)
+
+
+def negative_of(config: Dict) -> str:
+    return config.get('negative', DEFAULT_NEGATIVE)
+
+
+def affinity_key(config: Dict) -> Tuple[str, str, int, int, int]:
+    """Jobs with equal keys reuse loaded models and latent buffers"""
+    return (
+        checkpoint_of(config),
+        motion_model_of(config),
+        config['width'],
+        config['height'],
+        config['frames'],
+    )
+
+
+def plan_jobs(jobs: Dict[str, Dict], cost_model: Optional[CostModel] = None) -> List[Job]:
+    """Order jobs by model, then latent shape, then negative prompt
+
+    Groups are ordered cheapest first (by estimated time when a cost model is
+    available, otherwise by work units) so results still arrive early.
+    """
+    cost = cost_model.estimate if cost_model else job_units
+
+    by_model: Dict[Tuple[str, str], Dict[Tuple, List[Job]]] = {}
+    for name, config in jobs.items():
+        key = affinity_key(config)
+        by_model.setdefault(key[:2], {}).setdefault(key, []).append((name, config))
+
+    def group_cost(group: List[Job]) -> float:
+        return sum(cost(config) for _, config in group)
+
+    ordered: List[Job] = []
+    model_groups = sorted(by_model.values(), key=lambda shapes: sum(group_cost(g) for g in shapes.values()))
+    for shapes in model_groups:
+        for group in sorted(shapes.values(), key=lambda g: cost(g[0][1])):
+            ordered.extend(sorted(group, key=lambda job: (negative_of(job[1]), cost(job[1]))))
+    return ordered
+
+
+def count_switches(ordered: List[Job]) -> Dict[str, int]:
+    """How often the server has to load a checkpoint / motion model or change latent shape"""
+    counts = {"checkpoint_loads": 0, "motion_model_loads": 0, "shape_changes": 0}
+    previous = None
+    for _, config in ordered:
+        key = affinity_key(config)
+        if previous is None or key[0] != previous[0]:
+            counts["checkpoint_loads"] += 1
+        if previous is None or key[1] != previous[1]:
+            counts["motion_model_loads"] += 1
+        if previous is None or key[2:] != previous[2:]:
+            counts["shape_changes"] += 1
+        previous = key
+    return counts
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render archive: deduplicated, delta-aware storage of every take
+
+Frames are stored as content-addressed chunks keyed by the SHA-256 of their
+decoded pixels (not the PNG bytes, which embed per-take prompt metadata), so
+a frame that appears in several takes or repeats inside a near-static loop is
+stored once. A new frame is stored either whole or as a wrapping uint8
+difference against the previous frame of the take, whichever compresses
+smaller; near-identical consecutive frames then cost only a few hundred
+bytes. Delta chains are capped at MAX_DELTA_CHAIN so restores stay fast.
+
+Layout:
+    <archive>/chunks/ab/abcdef...       one chunk per distinct frame
+    <archive>/takes/<animation>/<take>.json   compact index: shape + chunk list
+
+Usage:
+    python scripts/render_archive.py add <frame_dir> <animation> [--seed N]
+    python scripts/render_archive.py list [animation]
+    python scripts/render_archive.py restore <animation> <take> <out_dir>
+    python scripts/render_archive.py stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from render_qa import load_frames
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), "..", "renders", "archive")
+
+# Longest run of delta chunks before a full frame is forced
+MAX_DELTA_CHAIN = 16
+COMPRESS_LEVEL = 6
+
+# Chunk header: magic, kind (0 = full, 1 = delta), chain depth, base digest (delta only)
+_MAGIC = b"LVF1"
+_HEADER = struct.Struct(">4sBH")
+_FULL, _DELTA = 0, 1
+
+
+def frame_digest(frame: np.ndarray) -> str:
+    """SHA-256 of a frame's shape and pixels"""
+    digest = hashlib.sha256("x".join(map(str, frame.shape)).encode())
+    digest.update(np.ascontiguousarray(frame).data)
+    return digest.hexdigest()
+
+
+class RenderArchive:
+    """Content-addressed frame chunks plus one small index per take"""
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = os.path.abspath(root)
+        self.chunk_dir = os.path.join(self.root, "chunks")
+        self.take_dir = os.path.join(self.root, "takes")
+
+    # Chunks
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def has_chunk(self, digest: str) -> bool:
+        return os.path.exists(self._chunk_path(digest))
+
+    def _write_atomic(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per thread: the generator archives takes from worker threads
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _chunk_depth(self, digest: str) -> int:
+        with open(self._chunk_path(digest), 'rb') as f:
+            _, _, depth = _HEADER.unpack(f.read(_HEADER.size))
+        return depth
+
+    def _put_frame(self, frame: np.ndarray, digest: str,
+                   base: Optional[Tuple[str, np.ndarray, int]]) -> Tuple[int, int]:
+        """Store one frame unless already present; returns (bytes written, chain depth)"""
+        if self.has_chunk(digest):
+            return 0, self._chunk_depth(digest)
+
+        payload = zlib.compress(frame.tobytes(), COMPRESS_LEVEL)
+        data = _HEADER.pack(_MAGIC, _FULL, 0) + payload
+        depth = 0
+
+        if base is not None and base[2] < MAX_DELTA_CHAIN and base[1].shape == frame.shape:
+            # uint8 subtraction wraps, so restore is base + delta (mod 256)
+            delta = zlib.compress((frame - base[1]).tobytes(), COMPRESS_LEVEL)
+            if len(delta) + 32 < len(payload):
+                depth = base[2] + 1
+                data = _HEADER.pack(_MAGIC, _DELTA, depth) + bytes.fromhex(base[0]) + delta
+
+        self._write_atomic(self._chunk_path(digest), data)
+        return len(data), depth
+
+    def _load_frame(self, digest: str, shape: Tuple[int, ...], cache: Dict[str, np.ndarray]) -> np.ndarray:
+        """Decode a chunk, resolving delta chains through the cache"""
+        if digest in cache:
+            return cache[digest]
+        with open(self._chunk_path(digest), 'rb') as f:
+            data = f.read()
+        magic, kind, _ = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"Corrupt chunk {digest}")
+
+        offset = _HEADER.size
+        if kind == _DELTA:
+            base_digest = data[offset:offset + 32].hex()
+            offset += 32
+            base = self._load_frame(base_digest, shape, cache)
+            delta = np.frombuffer(zlib.decompress(data[offset:]), np.uint8).reshape(shape)
+            frame = base + delta
+        else:
+            frame = np.frombuffer(zlib.decompress(data[offset:]), np.uint8).reshape(shape)
+        cache[digest] = frame
+        return frame
+
+    # Takes
+
+    def _take_path(self, animation: str, take_id: str) -> str:
+        return os.path.join(self.take_dir, animation, take_id + ".json")
+
+    def add_take(self, animation: str, frames: np.ndarray, meta: Optional[Dict] = None) -> Dict:
+        """Archive a uint8 (frames, height, width, channels) stack; returns the take index"""
+        meta = meta or {}
+        take_id = time.strftime("%Y%m%d-%H%M%S")
+        if 'seed' in meta:
+            take_id += f"-s{meta['seed']}"
+        suffix = 1
+        base_id = take_id
+        while os.path.exists(self._take_path(animation, take_id)):
+            suffix += 1
+            take_id = f"{base_id}-{suffix}"
+
+        digests: List[str] = []
+        written = 0
+        previous: Optional[Tuple[str, np.ndarray, int]] = None
+        for frame in frames:
+            digest = frame_digest(frame)
+            size, depth = self._put_frame(frame, digest, previous)
+            written += size
+            digests.append(digest)
+            previous = (digest, frame, depth)
+
+        index = {
+            "animation": animation,
+            "take": take_id,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "shape": list(frames.shape[1:]),
+            "frames": digests,
+            "stored_bytes": written,
+            "raw_bytes": int(frames.nbytes),
+            "meta": meta,
+        }
+        self._write_atomic(self._take_path(animation, take_id), json.dumps(index).encode('utf-8'))
+        return index
+
+    def load_take(self, animation: str, take_id: str) -> Dict:
+        with open(self._take_path(animation, take_id), 'r') as f:
+            return json.load(f)
+
+    def list_takes(self, animation: Optional[str] = None) -> List[Dict]:
+        """Take indexes, oldest first"""
+        if not os.path.isdir(self.take_dir):
+            return []
+        animations = [animation] if animation else sorted(os.listdir(self.take_dir))
+        takes = []
+        for name in animations:
+            folder = os.path.join(self.take_dir, name)
+            if os.path.isdir(folder):
+                takes.extend(self.load_take(name, f[:-5]) for f in sorted(os.listdir(folder)) if f.endswith('.json'))
+        return takes
+
+    def restore(self, animation: str, take_id: str) -> np.ndarray:
+        """Rebuild a take's frame stack"""
+        index = self.load_take(animation, take_id)
+        shape = tuple(index["shape"])
+        cache: Dict[str, np.ndarray] = {}
+        return np.stack([self._load_frame(d, shape, cache) for d in index["frames"]])
+
+    def restore_to_dir(self, animation: str, take_id: str, out_dir: str) -> int:
+        """Write a take back out as 00001.png, 00002.png, ... for re-encoding"""
+        frames = self.restore(animation, take_id)
+        os.makedirs(out_dir, exist_ok=True)
+        for i, frame in enumerate(frames, start=1):
+            Image.fromarray(frame).save(os.path.join(out_dir, f"{i:05d}.png"))
+        return len(frames)
+
+    def stats(self) -> Dict[str, int]:
+        takes = self.list_takes()
+        chunk_bytes = 0
+        chunks = 0
+        for dirpath, _, filenames in os.walk(self.chunk_dir):
+            for name in filenames:
+                chunks += 1
+                chunk_bytes += os.path.getsize(os.path.join(dirpath, name))
+        return {
+            "takes": len(takes),
+            "frames": sum(len(t["frames"]) for t in takes),
+            "chunks": chunks,
+            "raw_bytes": sum(t["raw_bytes"] for t in takes),
+            "stored_bytes": chunk_bytes,
+        }
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1e6:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated archive of rendered takes")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="Archive a folder of PNG frames as a new take")
+    add.add_argument("frame_dir")
+    add.add_argument("animation")
+    add.add_argument("--seed", type=int)
+
+    lst = sub.add_parser("list", help="List archived takes")
+    lst.add_argument("animation", nargs="?")
+
+    restore = sub.add_parser("restore", help="Write a take back out as PNG frames")
+    restore.add_argument("animation")
+    restore.add_argument("take")
+    restore.add_argument("out_dir")
+
+    sub.add_parser("stats", help="Show archive size vs raw frame size")
+    args = parser.parse_args()
+
+    archive = RenderArchive(args.archive_dir)
+    if args.command == "add":
+        meta = {"seed": args.seed} if args.seed is not None else {}
+        index = archive.add_take(args.animation, load_frames(args.frame_dir), meta)
+        print(f"[OK] {args.animation}/{index['take']}: {len(index['frames'])} frames, "
+              f"{_mb(index['stored_bytes'])} new of {_mb(index['raw_bytes'])} raw")
+    elif args.command == "list":
+        for take in archive.list_takes(args.animation):
+            status = take["meta"].get("qa_passed")
+            label = "" if status is None else (" [QA ok]" if status else " [QA fail]")
+            print(f"{take['animation']}/{take['take']}: {len(take['frames'])} frames, "
+                  f"{_mb(take['stored_bytes'])} new{label}")
+    elif args.command == "restore":
+        count = archive.restore_to_dir(args.animation, args.take, args.out_dir)
+        print(f"[OK] Restored {count} frames to {args.out_dir}")
+    elif args.command == "stats":
+        stats = archive.stats()
+        ratio = stats["raw_bytes"] / max(stats["stored_bytes"], 1)
+        print(f"Takes: {stats['takes']}, frames: {stats['frames']}, unique chunks: {stats['chunks']}")
+        print(f"Raw: {_mb(stats['raw_bytes'])}, stored: {_mb(stats['stored_bytes'])} ({ratio:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
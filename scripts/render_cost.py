@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render cost model for a COMFYUI server
+
+Models render time as a fixed overhead plus a per-unit cost, where one unit is
+one pixel x frame x sampler step:
+
+    seconds = overhead + seconds_per_unit * width * height * frames * steps
+
+The model is fitted from calibration renders (see `python scripts/test_comfyui.py --probe`)
+and saved in a JSON profile, one model per server URL, that the generator uses
+for per-job timeouts, ETAs and queue ordering. Jobs larger than the biggest
+calibration render are extrapolated, so their timeout never drops below
+DEFAULT_TIMEOUT.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+PROFILE_PATH = os.path.join(os.path.dirname(__file__), "render_profile.json")
+
+# Used when a server has no profile, and as the floor for jobs beyond the
+# calibrated range: matches the old flat 30 minute timeout
+DEFAULT_TIMEOUT = 1800
+DEFAULT_STEPS = 20
+
+# Timeout = estimate * TIMEOUT_FACTOR + TIMEOUT_SLACK, floored at MIN_TIMEOUT
+TIMEOUT_FACTOR = 3.0
+TIMEOUT_SLACK = 60
+MIN_TIMEOUT = 120
+
+
+def job_units(config: Dict) -> int:
+    """Work units for a job: pixels x frames x steps"""
+    return config['width'] * config['height'] * config['frames'] * config.get('steps', DEFAULT_STEPS)
+
+
+@dataclass
+class CostModel:
+    """Linear render-time model fitted for one server"""
+    overhead: float
+    seconds_per_unit: float
+    server: str = ""
+    samples: int = 0
+    max_units: int = 0  # largest calibrated job
+
+    def estimate(self, config: Dict) -> float:
+        """Estimated render time in seconds"""
+        return self.overhead + self.seconds_per_unit * job_units(config)
+
+    def timeout_for(self, config: Dict) -> int:
+        """Per-job timeout: generous multiple of the estimate, never below MIN_TIMEOUT
+
+        Beyond the calibrated range the estimate is an extrapolation (and
+        temporal attention grows faster than linearly with frames), so the
+        timeout is never shorter than DEFAULT_TIMEOUT there.
+        """
+        timeout = max(MIN_TIMEOUT, self.estimate(config) * TIMEOUT_FACTOR + TIMEOUT_SLACK)
+        if job_units(config) > self.max_units:
+            timeout = max(timeout, DEFAULT_TIMEOUT)
+        return int(timeout)
+
+    @classmethod
+    def fit(cls, samples: Sequence[Tuple[int, float]], server: str = "") -> "CostModel":
+        """Least-squares fit of (units, seconds) samples"""
+        if not samples:
+            raise ValueError("At least one calibration sample is required")
+        n = len(samples)
+        max_units = max(u for u, _ in samples)
+        mean_x = sum(u for u, _ in samples) / n
+        mean_y = sum(s for _, s in samples) / n
+        var_x = sum((u - mean_x) ** 2 for u, _ in samples)
+
+        if n < 2 or var_x == 0:
+            # Not enough spread to separate overhead from per-unit cost
+            return cls(overhead=0.0, seconds_per_unit=mean_y / max(mean_x, 1), server=server, samples=n,
+                       max_units=max_units)
+
+        slope = sum((u - mean_x) * (s - mean_y) for u, s in samples) / var_x
+        slope = max(slope, 0.0)
+        overhead = max(mean_y - slope * mean_x, 0.0)
+        return cls(overhead=overhead, seconds_per_unit=slope, server=server, samples=n, max_units=max_units)
+
+    def save(self, path: str = PROFILE_PATH):
+        """Store this model under its server URL, keeping other servers' models"""
+        profiles = _read_profiles(path)
+        profiles[server_key(self.server)] = asdict(self)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(profiles, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, server: str, path: str = PROFILE_PATH) -> Optional["CostModel"]:
+        """Load a server's model, or None if that server has not been probed"""
+        data = _read_profiles(path).get(server_key(server))
+        try:
+            return cls(**data) if data else None
+        except TypeError:
+            return None
+
+
+def server_key(url: str) -> str:
+    return url.rstrip('/')
+
+
+def _read_profiles(path: str) -> Dict[str, Dict]:
+    try:
+        with open(path, 'r') as f:
+            profiles = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(profiles, dict):
+        return {}
+    if "overhead" in profiles:
+        # Single-model profile from before models were kept per server
+        return {server_key(profiles.get("server", "")): profiles}
+    return profiles
+
+
+def timeout_for(model: Optional[CostModel], config: Dict) -> int:
+    """Timeout for a job, falling back to DEFAULT_TIMEOUT when unprobed"""
+    return model.timeout_for(config) if model else DEFAULT_TIMEOUT
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
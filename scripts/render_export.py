@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export rendered frame stacks for the app
+
+Each accepted take is written in three formats from the same uint8
+(frames, height, width, 3) stack:
+
+- MP4 (ffmpeg):        smallest for long loops, but needs a video decoder to
+                       start before the first frame shows
+- animated WebP:       decoded as an image, first frame shows immediately
+- sprite sheet + JSON: frames packed into grid pages (<= MAX_SHEET_SIZE px a side)
+                       with an index of frame positions; one image decode, then
+                       playback is just moving a crop rectangle
+
+The render manifest (assets/animations/manifest.json) records the size and an
+estimated start-up cost of every format, plus which one is smallest, which is
+fastest to show and which the app should prefer.
+
+Usage:
+    python scripts/render_export.py <frame_dir> <animation-name> [--fps 24]
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from render_qa import load_frames
+
+MANIFEST_NAME = "manifest.json"
+
+# Largest texture side that is safe on low-end mobile GPUs
+MAX_SHEET_SIZE = 4096
+WEBP_QUALITY = 80
+
+# Rough start-up model for choosing a format: fixed set-up cost plus the
+# pixels that must be decoded before the first frame can be drawn
+STARTUP_FIXED_MS = {"mp4": 150.0, "webp": 5.0, "sprite": 5.0}
+DECODE_NS_PER_PIXEL = 10.0
+
+# A format may be up to this much larger than the smallest one and still be
+# preferred for starting faster
+SIZE_TOLERANCE = 1.5
+
+
+def pack_sprite_sheets(frames: np.ndarray, max_size: int = MAX_SHEET_SIZE) -> Dict:
+    """Pack frames into grid pages with one reshape/transpose per page
+
+    Returns {"sheets": [uint8 arrays], "index": {...}} where the index maps
+    each frame to (sheet, x, y).
+    """
+    count, height, width, channels = frames.shape
+    columns = max(1, min(count, max_size // width))
+    rows_per_sheet = max(1, max_size // height)
+    per_sheet = columns * rows_per_sheet
+
+    sheets = []
+    for start in range(0, count, per_sheet):
+        page = frames[start:start + per_sheet]
+        rows = math.ceil(len(page) / columns)
+        padding = rows * columns - len(page)
+        if padding:
+            page = np.concatenate([page, np.zeros((padding, height, width, channels), page.dtype)])
+        # (rows*cols, H, W, C) -> (rows, H, cols, W, C) -> (rows*H, cols*W, C)
+        sheet = page.reshape(rows, columns, height, width, channels).transpose(0, 2, 1, 3, 4)
+        sheets.append(np.ascontiguousarray(sheet.reshape(rows * height, columns * width, channels)))
+
+    positions = np.arange(count)
+    local = positions % per_sheet
+    index = {
+        "frame_width": width,
+        "frame_height": height,
+        "frame_count": count,
+        "columns": columns,
+        "frames": [
+            {"sheet": int(s), "x": int(x), "y": int(y)}
+            for s, x, y in zip(positions // per_sheet, (local % columns) * width, (local // columns) * height)
+        ],
+    }
+    return {"sheets": sheets, "index": index}
+
+
+def export_webp(frames: np.ndarray, path: str, fps: int, quality: int = WEBP_QUALITY) -> int:
+    """Write an endlessly looping animated WebP; returns its size in bytes"""
+    images = [Image.fromarray(frame) for frame in frames]
+    images[0].save(
+        path,
+        format="WEBP",
+        save_all=True,
+        append_images=images[1:],
+        duration=round(1000 / fps),
+        loop=0,
+        quality=quality,
+        method=4,
+    )
+    return os.path.getsize(path)
+
+
+def export_sprite_sheets(frames: np.ndarray, output_dir: str, name: str, fps: int,
+                         quality: int = WEBP_QUALITY) -> Dict:
+    """Write sprite sheet pages and their frame index; returns size info"""
+    packed = pack_sprite_sheets(frames)
+    files = []
+    total = 0
+    for i, sheet in enumerate(packed["sheets"]):
+        filename = f"{name}.sprite-{i}.webp"
+        path = os.path.join(output_dir, filename)
+        Image.fromarray(sheet).save(path, format="WEBP", quality=quality, method=4)
+        files.append(filename)
+        total += os.path.getsize(path)
+
+    index = dict(packed["index"], fps=fps, sheets=files)
+    index_file = f"{name}.sprite.json"
+    index_path = os.path.join(output_dir, index_file)
+    with open(index_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    total += os.path.getsize(index_path)
+
+    first_sheet = packed["sheets"][0]
+    return {
+        "file": index_file,
+        "bytes": total,
+        "sheets": files,
+        "first_paint_pixels": int(first_sheet.shape[0] * first_sheet.shape[1]),
+        "decoded_bytes": int(sum(s.size for s in packed["sheets"]) // 3 * 4),
+    }
+
+
+def convert_images_to_video(image_dir: str, output_path: str, fps: int = 24):
+    """Convert image sequence to MP4 video using ffmpeg"""
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    # Use ffmpeg to create video from images
+    cmd = [
+        "ffmpeg",
+        "-y",  # Overwrite output file
+        "-framerate", str(fps),
+        "-i", f"{image_dir}/%05d.png",  # Input pattern
+        "-c:v", "libx264",
+        "-pix_fmt", "yuv420p",
+        "-crf", "23",  # Quality (lower = better, 18-28 is good range)
+        "-preset", "medium",
+        "-loop", "1",  # Loop once for seamless playback
+        output_path
+    ]
+    
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        print(f"[OK] Video created: {output_path}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] Error creating video: {e}")
+        print(f"  stdout: {e.stdout.decode()}")
+        print(f"  stderr: {e.stderr.decode()}")
+        return False
+    except FileNotFoundError:
+        print("[ERROR] ffmpeg not found. Please install ffmpeg to convert images to video.")
+        return False
+
+
+def export_mp4(frames: np.ndarray, path: str, fps: int) -> Optional[int]:
+    """Encode frames to MP4 with ffmpeg; returns the size, or None if ffmpeg failed"""
+    with tempfile.TemporaryDirectory() as frame_dir:
+        for i, frame in enumerate(frames, start=1):
+            Image.fromarray(frame).save(os.path.join(frame_dir, f"{i:05d}.png"), compress_level=1)
+        if not convert_images_to_video(frame_dir, path, fps):
+            return None
+    return os.path.getsize(path)
+
+
+def startup_ms(fmt: str, first_paint_pixels: int) -> float:
+    return STARTUP_FIXED_MS[fmt] + first_paint_pixels * DECODE_NS_PER_PIXEL / 1e6
+
+
+def choose_formats(formats: Dict[str, Dict]) -> Dict[str, str]:
+    """Pick the smallest, the fastest-starting and the preferred format"""
+    smallest = min(formats, key=lambda f: formats[f]["bytes"])
+    fastest = min(formats, key=lambda f: formats[f]["startup_ms"])
+    limit = formats[smallest]["bytes"] * SIZE_TOLERANCE
+    preferred = min(
+        (f for f in formats if formats[f]["bytes"] <= limit),
+        key=lambda f: (formats[f]["startup_ms"], formats[f]["bytes"]),
+    )
+    return {"smallest": smallest, "fastest_start": fastest, "preferred": preferred}
+
+
+def export_animation(name: str, frames: np.ndarray, output_dir: str, fps: int = 24,
+                     formats: Optional[List[str]] = None) -> Dict:
+    """Write every format for one animation and return its manifest entry"""
+    formats = formats or ["mp4", "webp", "sprite"]
+    os.makedirs(output_dir, exist_ok=True)
+    count, height, width, _ = frames.shape
+    results: Dict[str, Dict] = {}
+
+    if "mp4" in formats:
+        size = export_mp4(frames, os.path.join(output_dir, f"{name}.mp4"), fps)
+        if size is not None:
+            results["mp4"] = {"file": f"{name}.mp4", "bytes": size, "first_paint_pixels": width * height}
+
+    if "webp" in formats:
+        size = export_webp(frames, os.path.join(output_dir, f"{name}.webp"), fps)
+        results["webp"] = {"file": f"{name}.webp", "bytes": size, "first_paint_pixels": width * height}
+
+    if "sprite" in formats:
+        results["sprite"] = export_sprite_sheets(frames, output_dir, name, fps)
+
+    for fmt, info in results.items():
+        info["startup_ms"] = round(startup_ms(fmt, info["first_paint_pixels"]), 1)
+
+    entry = {"width": width, "height": height, "frames": count, "fps": fps, "formats": results}
+    if results:
+        entry.update(choose_formats(results))
+    return entry
+
+
+def update_manifest(output_dir: str, name: str, entry: Dict):
+    """Merge one animation's entry into the render manifest"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    manifest[name] = entry
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def print_entry(name: str, entry: Dict):
+    for fmt, info in entry["formats"].items():
+        print(f"  {fmt}: {info['bytes'] / 1024:.1f} KB, ~{info['startup_ms']:.0f} ms to first frame")
+    if entry["formats"]:
+        print(f"[OK] {name}: smallest={entry['smallest']}, fastest={entry['fastest_start']}, "
+              f"preferred={entry['preferred']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a frame folder as MP4, animated WebP and sprite sheet")
+    parser.add_argument("frame_dir", help="Folder of PNG frames")
+    parser.add_argument("name", help="Animation name, e.g. desire-black-hole")
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--output-dir", default="assets/animations")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frame_dir)
+    entry = export_animation(args.name, frames, args.output_dir, args.fps)
+    update_manifest(args.output_dir, args.name, entry)
+    print_entry(args.name, entry)
+
+
+if __name__ == "__main__":
+    main()
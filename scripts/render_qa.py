@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render QA for generated animations
+
+Computes per-frame metrics over the whole frame stack at once (numpy, no
+per-frame Python loops) and checks them against thresholds:
+
+- motion:  mean absolute difference between consecutive frames
+           (too low = static render, isolated spikes = choppy render)
+- flicker: second temporal difference of frame brightness
+           (brightness pumping up and down between frames)
+- seam:    difference between the last and first frame, relative to the
+           typical frame-to-frame motion (a visible jump when looping)
+- blank:   frames that are black or flat
+
+Usage:
+    python scripts/render_qa.py path/to/frames/      # check a folder of PNG frames
+"""
+
+import io
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from PIL import Image
+
+# Rec. 601 luma weights
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+@dataclass
+class QAThresholds:
+    """Pass/fail limits; values are on a 0-1 brightness scale"""
+    min_motion: float = 0.002        # median frame diff below this = static
+    max_choppy_ratio: float = 8.0    # max frame diff / median frame diff
+    max_flicker: float = 0.02        # peak |2nd difference| of mean brightness
+    max_seam_ratio: float = 4.0      # loop seam diff / median frame diff
+    blank_std: float = 0.01          # frames flatter than this are blank
+    blank_mean: float = 0.02         # frames darker than this are black
+    max_blank_frames: int = 0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "QAThresholds":
+        """Defaults overridden by an animation's optional "qa" dict"""
+        return cls(**config.get('qa', {}))
+
+
+@dataclass
+class QAResult:
+    passed: bool
+    reasons: List[str] = field(default_factory=list)
+    summary: Dict[str, float] = field(default_factory=dict)
+
+
+def decode_frames(images: Iterable[bytes]) -> np.ndarray:
+    """Decode encoded images into a uint8 (frames, height, width, 3) stack"""
+    return np.stack([np.asarray(Image.open(io.BytesIO(data)).convert('RGB')) for data in images])
+
+
+def load_frames(frame_dir: str) -> np.ndarray:
+    """Load every PNG in a folder (sorted by name) into a frame stack"""
+    names = sorted(n for n in os.listdir(frame_dir) if n.lower().endswith('.png'))
+    return np.stack([np.asarray(Image.open(os.path.join(frame_dir, n)).convert('RGB')) for n in names])
+
+
+def luma_stack(frames: np.ndarray, downsample: int = 2) -> np.ndarray:
+    """Float32 (frames, h, w) luminance in 0-1, optionally subsampled to save memory"""
+    if downsample > 1:
+        frames = frames[:, ::downsample, ::downsample]
+    return (frames.astype(np.float32) @ _LUMA) / 255.0
+
+
+def frame_metrics(frames: np.ndarray, downsample: int = 2) -> Dict[str, np.ndarray]:
+    """Per-frame metric arrays for the whole stack"""
+    luma = luma_stack(frames, downsample)
+    motion = np.abs(np.diff(luma, axis=0)).mean(axis=(1, 2))
+    brightness = luma.mean(axis=(1, 2))
+    flicker = np.abs(np.diff(brightness, n=2)) if len(brightness) > 2 else np.zeros(0, np.float32)
+    seam = np.array([np.abs(luma[-1] - luma[0]).mean()], dtype=np.float32)
+    return {
+        "motion": motion,
+        "flicker": flicker,
+        "seam": seam,
+        "brightness": brightness,
+        "contrast": luma.std(axis=(1, 2)),
+    }
+
+
+def evaluate(frames: np.ndarray, thresholds: Optional[QAThresholds] = None) -> QAResult:
+    """Check a frame stack against the thresholds"""
+    t = thresholds or QAThresholds()
+    if len(frames) < 2:
+        return QAResult(passed=False, reasons=[f"only {len(frames)} frame(s)"])
+
+    m = frame_metrics(frames)
+    median_motion = float(np.median(m["motion"]))
+    max_motion = float(m["motion"].max())
+    choppy_ratio = max_motion / max(median_motion, 1e-6)
+    flicker = float(m["flicker"].max()) if m["flicker"].size else 0.0
+    seam_ratio = float(m["seam"][0]) / max(median_motion, 1e-6)
+    blank = (m["contrast"] < t.blank_std) | (m["brightness"] < t.blank_mean)
+    blank_frames = int(blank.sum())
+
+    reasons = []
+    if median_motion < t.min_motion:
+        reasons.append(f"static (median motion {median_motion:.4f} < {t.min_motion})")
+    elif choppy_ratio > t.max_choppy_ratio:
+        reasons.append(f"choppy (frame {int(m['motion'].argmax()) + 1} jumps {choppy_ratio:.1f}x median motion)")
+    if flicker > t.max_flicker:
+        reasons.append(f"flicker (brightness 2nd diff {flicker:.4f} > {t.max_flicker})")
+    if median_motion >= t.min_motion and seam_ratio > t.max_seam_ratio:
+        reasons.append(f"loop seam ({seam_ratio:.1f}x median motion)")
+    if blank_frames > t.max_blank_frames:
+        first = int(np.flatnonzero(blank)[0]) + 1
+        reasons.append(f"{blank_frames} blank/black frame(s), first at frame {first}")
+
+    summary = {
+        "frames": int(len(frames)),
+        "median_motion": median_motion,
+        "choppy_ratio": choppy_ratio,
+        "flicker": flicker,
+        "seam_ratio": seam_ratio,
+        "blank_frames": blank_frames,
+    }
+    return QAResult(passed=not reasons, reasons=reasons, summary=summary)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/render_qa.py <frame_dir>")
+        sys.exit(1)
+
+    frames = load_frames(sys.argv[1])
+    result = evaluate(frames)
+    for key, value in result.summary.items():
+        print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+    if result.passed:
+        print("[OK] QA passed")
+    else:
+        for reason in result.reasons:
+            print(f"[FAIL] {reason}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asset Reference Scanner
+Reports bundle assets that are unused, oversized or duplicated.
+
+Builds a reference index in one pass over the TS/TSX sources under src/
+(including src/assets/animations/index.ts), the root entry files (package.json
+"main" and App.tsx) and app.json, then cross-checks it
+against the asset tree. Duplicate detection only hashes files whose sizes
+collide, so the scan stays cheap enough to run on every build.
+
+Usage:
+    python scripts/scan_assets.py
+    python scripts/scan_assets.py --max-size 300 --json
+    python scripts/scan_assets.py --strict    # non-zero exit on any finding
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Set
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Extensions Metro bundles as assets
+ASSET_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp",
+    ".mp4", ".mov", ".webm",
+    ".mp3", ".m4a", ".wav", ".aac", ".ogg",
+    ".ttf", ".otf", ".lottie",
+)
+SOURCE_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+
+# Directories searched for assets; top-level files are checked too
+ASSET_DIRS = ["assets", "src/assets", "UI"]
+SKIP_DIRS = {"node_modules", ".git", ".expo", "android", "ios", "ComfyUI", "__pycache__"}
+
+# Strings and comments, so comments can be dropped without touching string contents
+_COMMENT_RE = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`)|//[^\n]*|/\*.*?\*/",
+    re.DOTALL,
+)
+_EXT_GROUP = "|".join(re.escape(ext[1:]) for ext in ASSET_EXTENSIONS)
+_REFERENCE_RE = re.compile(
+    r"""(?:require\(\s*|from\s+|import\s+)['"]([^'"]+\.(?:%s))['"]""" % _EXT_GROUP,
+    re.IGNORECASE,
+)
+
+
+def _strip_comments(source: str) -> str:
+    return _COMMENT_RE.sub(lambda m: m.group(1) or "", source)
+
+
+def _walk(root: str, extensions: Iterable[str]) -> Iterable[str]:
+    extensions = tuple(extensions)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name.lower().endswith(extensions):
+                yield os.path.join(dirpath, name)
+
+
+def _json_paths(value) -> Iterable[str]:
+    """Yield every relative path string found in a JSON document"""
+    if isinstance(value, dict):
+        for v in value.values():
+            yield from _json_paths(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _json_paths(v)
+    elif isinstance(value, str) and value.startswith(("./", "../")):
+        yield value
+
+
+def entry_files(project_root: str = PROJECT_ROOT) -> List[str]:
+    """Bundle entry points outside src/: package.json "main" and the root App component"""
+    candidates = []
+    package_json = os.path.join(project_root, "package.json")
+    if os.path.exists(package_json):
+        with open(package_json, 'r', encoding='utf-8') as f:
+            main = json.load(f).get("main")
+        if isinstance(main, str):
+            main_path = os.path.join(project_root, main)
+            candidates.append(main_path)
+            candidates.extend(main_path + ext for ext in SOURCE_EXTENSIONS)
+    candidates.extend(os.path.join(project_root, "App" + ext) for ext in SOURCE_EXTENSIONS)
+
+    files = []
+    for path in candidates:
+        path = os.path.normpath(path)
+        if os.path.isfile(path) and path.lower().endswith(SOURCE_EXTENSIONS) and path not in files:
+            files.append(path)
+    return files
+
+
+def build_reference_index(project_root: str = PROJECT_ROOT) -> Dict[str, List[str]]:
+    """Map each referenced asset (absolute path) to the files that reference it"""
+    index: Dict[str, List[str]] = {}
+
+    sources = list(_walk(os.path.join(project_root, "src"), SOURCE_EXTENSIONS)) + entry_files(project_root)
+    for source_path in sources:
+        with open(source_path, 'r', encoding='utf-8', errors='replace') as f:
+            source = _strip_comments(f.read())
+        base_dir = os.path.dirname(source_path)
+        for match in _REFERENCE_RE.finditer(source):
+            target = match.group(1)
+            if not target.startswith("."):
+                continue
+            resolved = os.path.normpath(os.path.join(base_dir, target))
+            index.setdefault(resolved, []).append(os.path.relpath(source_path, project_root))
+
+    app_json = os.path.join(project_root, "app.json")
+    if os.path.exists(app_json):
+        with open(app_json, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        for target in _json_paths(config):
+            resolved = os.path.normpath(os.path.join(project_root, target))
+            index.setdefault(resolved, []).append("app.json")
+
+    return index
+
+
+def collect_assets(project_root: str = PROJECT_ROOT) -> Dict[str, int]:
+    """Map every asset file in the tree (absolute path) to its size in bytes"""
+    assets: Dict[str, int] = {}
+    for directory in ASSET_DIRS:
+        root = os.path.join(project_root, directory)
+        if os.path.isdir(root):
+            for path in _walk(root, ASSET_EXTENSIONS):
+                assets[os.path.normpath(path)] = os.path.getsize(path)
+    for name in os.listdir(project_root):
+        path = os.path.join(project_root, name)
+        if os.path.isfile(path) and name.lower().endswith(ASSET_EXTENSIONS):
+            assets[os.path.normpath(path)] = os.path.getsize(path)
+    return assets
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_duplicates(assets: Dict[str, int]) -> List[List[str]]:
+    """Group files with identical content; only size collisions are hashed"""
+    by_size: Dict[int, List[str]] = {}
+    for path, size in assets.items():
+        by_size.setdefault(size, []).append(path)
+
+    groups = []
+    for paths in by_size.values():
+        if len(paths) < 2:
+            continue
+        by_hash: Dict[str, List[str]] = {}
+        for path in paths:
+            by_hash.setdefault(_sha256(path), []).append(path)
+        groups.extend(sorted(g) for g in by_hash.values() if len(g) > 1)
+    return sorted(groups)
+
+
+def scan(project_root: str = PROJECT_ROOT, max_size_kb: int = 500) -> Dict:
+    """Cross-check the reference index against the asset tree"""
+    index = build_reference_index(project_root)
+    assets = collect_assets(project_root)
+    referenced: Set[str] = set(index)
+    rel = lambda p: os.path.relpath(p, project_root).replace(os.sep, "/")
+
+    unreferenced = sorted(p for p in assets if p not in referenced)
+    oversized = sorted(
+        (p for p in assets if p in referenced and assets[p] > max_size_kb * 1024),
+        key=lambda p: -assets[p],
+    )
+    missing = sorted(p for p in referenced if not os.path.exists(p))
+
+    return {
+        "unreferenced": [{"path": rel(p), "bytes": assets[p]} for p in unreferenced],
+        "oversized": [{"path": rel(p), "bytes": assets[p], "referenced_by": index[p]} for p in oversized],
+        "duplicates": [[rel(p) for p in group] for group in find_duplicates(assets)],
+        "missing": [{"path": rel(p), "referenced_by": index[p]} for p in missing],
+        "total_assets": len(assets),
+        "unreferenced_bytes": sum(assets[p] for p in unreferenced),
+    }
+
+
+def _kb(size: int) -> str:
+    return f"{size / 1024:.1f} KB"
+
+
+def print_report(report: Dict, max_size_kb: int):
+    print("=" * 60)
+    print("Asset Reference Report")
+    print("=" * 60)
+    print(f"Assets scanned: {report['total_assets']}")
+
+    print(f"\nUnreferenced ({len(report['unreferenced'])}, {_kb(report['unreferenced_bytes'])}):")
+    for item in report["unreferenced"]:
+        print(f"  - {item['path']} ({_kb(item['bytes'])})")
+
+    print(f"\nOversized referenced assets (> {max_size_kb} KB): {len(report['oversized'])}")
+    for item in report["oversized"]:
+        print(f"  - {item['path']} ({_kb(item['bytes'])}) <- {', '.join(item['referenced_by'])}")
+
+    print(f"\nDuplicate content groups: {len(report['duplicates'])}")
+    for group in report["duplicates"]:
+        print(f"  - {' == '.join(group)}")
+
+    if report["missing"]:
+        print(f"\n[ERROR] Referenced but missing: {len(report['missing'])}")
+        for item in report["missing"]:
+            print(f"  - {item['path']} <- {', '.join(item['referenced_by'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report unused, oversized and duplicate bundle assets")
+    parser.add_argument("--root", default=PROJECT_ROOT, help="Project root (default: repo root)")
+    parser.add_argument("--max-size", type=int, default=500, help="Oversize threshold in KB")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if anything is reported")
+    args = parser.parse_args()
+
+    report = scan(os.path.abspath(args.root), args.max_size)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.max_size)
+
+    if report["missing"]:
+        sys.exit(1)
+    if args.strict and (report["unreferenced"] or report["oversized"] or report["duplicates"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,57 @@
 #!/usr/bin/env python3
-"""Test COMFYUI connection and workflow format"""
-import urllib.request
-import json
+"""Test COMFYUI connection and workflow format
+
+Usage:
+    python scripts/test_comfyui.py            # connection + workflow check
+    python scripts/test_comfyui.py --probe    # also fit a render cost profile
+"""
+import argparse
+import asyncio
 import sys
+import time
+
+import generate_comfyui_animations as generator
+from comfyui_client import COMFYUI_URL, ComfyUIClient, ComfyUIError, format_error
+from render_cost import DEFAULT_TIMEOUT, PROFILE_PATH, CostModel, format_duration, job_units
+
+# Renders spanning resolution, frame count and steps; the first one also
+# serves as a warm-up so model loading is not counted as render time. The
+# last is at catalog scale (80-120 frames x 20 steps) so real jobs are not
+# extrapolated far past the data, where fixed overhead dominates the fit.
+CALIBRATION_JOBS = [
+    {"width": 256, "height": 256, "frames": 8, "steps": 4},
+    {"width": 512, "height": 256, "frames": 8, "steps": 4},
+    {"width": 512, "height": 256, "frames": 16, "steps": 6},
+    {"width": 512, "height": 384, "frames": 16, "steps": 6},
+    {"width": 512, "height": 512, "frames": 16, "steps": 8},
+    {"width": 512, "height": 512, "frames": 96, "steps": 20},
+]
+
 
-COMFYUI_URL = "http://127.0.0.1:8188"
+async def check_server(client: ComfyUIClient) -> dict:
+    """Fetch node definitions once and report what is installed"""
+    data = await client.object_info()
 
-try:
-    # Check if COMFYUI is running
-    response = urllib.request.urlopen(f"{COMFYUI_URL}/object_info")
-    data = json.loads(response.read())
-    
     print("COMFYUI is running!")
     print(f"Available nodes: {len(data)}")
-    
+
     # Check for AnimateDiff nodes
     animatediff_nodes = [k for k in data.keys() if 'animate' in k.lower() or 'ade' in k.lower() or 'motion' in k.lower()]
     if animatediff_nodes:
         print(f"\nAnimateDiff nodes found: {animatediff_nodes[:10]}")
     else:
         print("\n⚠️  No AnimateDiff nodes found. Extension may not be loaded.")
-    
+
     # Check available models
-    try:
-        models_resp = urllib.request.urlopen(f"{COMFYUI_URL}/object_info")
-        models_data = json.loads(models_resp.read())
-        if 'CheckpointLoaderSimple' in models_data:
-            checkpoint_info = models_data['CheckpointLoaderSimple']
-            if 'input' in checkpoint_info and 'required' in checkpoint_info['input']:
-                if 'ckpt_name' in checkpoint_info['input']['required']:
-                    # Try to get available checkpoints
-                    print("\nChecking for available checkpoints...")
-    except:
-        pass
-    
-    # Test simple workflow
+    checkpoint_info = data.get('CheckpointLoaderSimple', {})
+    ckpt_input = checkpoint_info.get('input', {}).get('required', {}).get('ckpt_name')
+    if ckpt_input and isinstance(ckpt_input[0], list):
+        print(f"\nAvailable checkpoints: {ckpt_input[0][:10]}")
+    return data
+
+
+async def check_workflow(client: ComfyUIClient):
+    """Submit a minimal prompt that includes an output node"""
     print("\nTesting workflow format...")
     test_workflow = {
         "1": {
@@ -42,29 +59,117 @@ try:
                 "ckpt_name": "v1-5-pruned-emaonly.safetensors"
             },
             "class_type": "CheckpointLoaderSimple"
-        }
+        },
+        "2": {
+            "inputs": {"width": 64, "height": 64, "batch_size": 1},
+            "class_type": "EmptyLatentImage"
+        },
+        "3": {
+            "inputs": {"samples": ["2", 0], "vae": ["1", 2]},
+            "class_type": "VAEDecode"
+        },
+        "4": {
+            "inputs": {"images": ["3", 0]},
+            "class_type": "PreviewImage"
+        },
     }
-    
-    req = urllib.request.Request(
-        f"{COMFYUI_URL}/prompt",
-        json.dumps({"prompt": test_workflow}).encode()
-    )
-    req.add_header('Content-Type', 'application/json')
-    
+
     try:
-        resp = urllib.request.urlopen(req, timeout=5)
-        result = json.loads(resp.read())
+        result = await client.queue_prompt(test_workflow)
         print(f"✅ Workflow format OK! Response: {result}")
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode()
-        print(f"[ERROR] Workflow error: {e.code}")
-        print(f"Error details: {error_body[:500]}")
+    except ComfyUIError as e:
+        print(f"[ERROR] Workflow error: {format_error(e)}")
     except Exception as e:
         print(f"[ERROR] Error: {e}")
-        
-except urllib.error.URLError:
-    print("❌ COMFYUI is not running or not accessible")
-    print(f"   Make sure COMFYUI is running at {COMFYUI_URL}")
-except Exception as e:
-    print(f"❌ Error: {e}")
 
+
+async def run_calibration_job(client: ComfyUIClient, index: int, config: dict, timeout: int = DEFAULT_TIMEOUT):
+    """Render one calibration job and return its execution time in seconds"""
+    config = dict(config, prompt="calibration render, abstract gradient")
+    workflow = generator.create_workflow(f"calibration-{index}", config)
+    workflow["6"]["inputs"]["seed"] = 1000 + index  # defeat the server's result cache
+    workflow["9"] = {"inputs": {"images": ["8", 0]}, "class_type": "PreviewImage"}
+
+    started = time.time()
+    prompt_id = (await generator.queue_prompt(client, workflow)).get('prompt_id')
+    if not prompt_id:
+        return None
+    if not await client.wait_for_completion(prompt_id, timeout=timeout):
+        await generator.cancel_prompt(client, prompt_id)
+        return None
+    history = await client.get_history(prompt_id)
+    measured = generator.get_execution_time(history.get(prompt_id, {}))
+    return measured if measured is not None else time.time() - started
+
+
+async def probe(client: ComfyUIClient, profile_path: str = PROFILE_PATH) -> CostModel:
+    """Render calibration jobs and fit a seconds-per-(pixel x frame x step) model"""
+    print("\nProbing render capacity...")
+
+    samples = []
+    for index, config in enumerate(CALIBRATION_JOBS):
+        label = f"{config['width']}x{config['height']} x{config['frames']} frames, {config['steps']} steps"
+        seconds = await run_calibration_job(client, index, config)
+        if seconds is None:
+            print(f"  [ERROR] {label}: did not complete")
+            continue
+        if index == 0:
+            print(f"  warm-up {label}: {seconds:.1f}s")
+            continue
+        samples.append((job_units(config), seconds))
+        print(f"  {label}: {seconds:.1f}s")
+
+    if not samples:
+        raise RuntimeError("No calibration job completed")
+
+    model = CostModel.fit(samples, server=client.base_url)
+    model.save(profile_path)
+    print(f"\n✅ Cost model: {model.overhead:.1f}s + {model.seconds_per_unit * 1e6:.3f}s per megaunit")
+    print(f"   Saved to: {profile_path} (for {client.base_url})")
+
+    print("\nEstimated render times:")
+    for name, config in generator.ANIMATIONS.items():
+        print(f"  {name}: {format_duration(model.estimate(config))} "
+              f"(timeout {format_duration(model.timeout_for(config))})")
+    return model
+
+
+async def main_async(args) -> int:
+    async with ComfyUIClient(args.server) as client:
+        try:
+            await check_server(client)
+        except (OSError, asyncio.TimeoutError):
+            print("❌ COMFYUI is not running or not accessible")
+            print(f"   Make sure COMFYUI is running at {args.server}")
+            return 1
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return 1
+
+        await check_workflow(client)
+
+        if args.probe:
+            try:
+                await probe(client)
+            except Exception as e:
+                print(f"❌ Probe failed: {e}")
+                return 1
+    return 0
+
+
+def main():
+    # Fix Windows console encoding
+    if sys.platform == 'win32':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+    parser = argparse.ArgumentParser(description="Test a COMFYUI server")
+    parser.add_argument("--server", default=COMFYUI_URL, help="COMFYUI base URL")
+    parser.add_argument("--probe", action="store_true", help="Render calibration jobs and save a cost profile")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
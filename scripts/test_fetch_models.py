@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Test fetch_models.py against a local HTTP stand-in
+
+The stand-in serves a random model file with Range support, a Hugging
+Face-style redirect carrying X-Linked-Etag, and an endpoint that drops the
+connection part-way through the body. No network access is needed.
+
+Usage:
+    python scripts/test_fetch_models.py
+"""
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+
+import fetch_models
+from fetch_models import FetchError, ModelCache, ModelSpec, fetch_model, resolve_sha256
+
+BODY = os.urandom(3 * 1024 * 1024 + 123)
+BODY_SHA256 = hashlib.sha256(BODY).hexdigest()
+CUT_AFTER = 1024 * 1024
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    """/model.bin, /redirect/model.bin (302 + X-Linked-Etag), /flaky/model.bin (cuts once)"""
+    requests = []
+    cuts_left = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _redirect(self):
+        self.send_response(302)
+        self.send_header("Location", "/model.bin")
+        self.send_header("X-Linked-Etag", f'"{BODY_SHA256}"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _body(self, head: bool):
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(BODY):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY) - start))
+        self.end_headers()
+        if head:
+            return
+        data = BODY[start:]
+        if self.path.startswith("/flaky/") and StandIn.cuts_left:
+            StandIn.cuts_left -= 1
+            data = data[:CUT_AFTER]
+        self.wfile.write(data)
+
+    def _handle(self, head: bool):
+        StandIn.requests.append((self.command, self.path))
+        if self.path.startswith("/redirect/"):
+            self._redirect()
+        elif self.path.endswith("/model.bin"):
+            self._body(head)
+        else:
+            self.send_error(404)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"{'[OK]' if ok else '[FAIL]'} {label}")
+    return ok
+
+
+def part_size(cache: ModelCache) -> int:
+    return sum(os.path.getsize(os.path.join(cache.partial_dir, n)) for n in os.listdir(cache.partial_dir))
+
+
+def downloads() -> int:
+    return sum(1 for method, _ in StandIn.requests if method == "GET")
+
+
+def run(base: str, work: str) -> bool:
+    results = []
+
+    # Hash published on the redirect, not on the file it points to
+    results.append(check("X-Linked-Etag read from the redirect", resolve_sha256(base + "/redirect/model.bin") == BODY_SHA256))
+    results.append(check("no hash without the header", resolve_sha256(base + "/model.bin") is None))
+
+    for label, sha256 in (("unverified", None), ("verified", BODY_SHA256)):
+        cache = ModelCache(os.path.join(work, f"cache-{label}"))
+        url = base + "/flaky/model.bin"
+        StandIn.cuts_left = 1
+        try:
+            cache.download(url, sha256)
+            results.append(check(f"{label}: truncated body raises FetchError", False))
+        except FetchError:
+            results.append(check(f"{label}: truncated body raises FetchError", True))
+        results.append(check(f"{label}: partial kept for resume", part_size(cache) == CUT_AFTER))
+        StandIn.requests.clear()
+        blob = cache.download(url, sha256)
+        resumed = any(path.startswith("/flaky/") for _, path in StandIn.requests)
+        results.append(check(f"{label}: resumed download is complete",
+                             resumed and fetch_models.sha256_file(blob) == BODY_SHA256 and not part_size(cache)))
+
+    # A complete body with the wrong hash is discarded
+    cache = ModelCache(os.path.join(work, "cache-mismatch"))
+    try:
+        cache.download(base + "/model.bin", "0" * 64)
+    except FetchError:
+        pass
+    results.append(check("mismatch after a complete download drops the partial", not part_size(cache)))
+
+    # No published hash: the second run is skipped via the recorded digest
+    cache = ModelCache(os.path.join(work, "cache-shared"))
+    spec = ModelSpec(name="model.bin", url=base + "/model.bin", subdir="test_models")
+    installs = [os.path.join(work, "ComfyUI-a"), os.path.join(work, "ComfyUI-b")]
+    StandIn.requests.clear()
+    first = fetch_model(spec, installs, cache)
+    first_downloads = downloads()
+    second = fetch_model(spec, installs, cache)
+    dests = [os.path.join(d, "models", spec.subdir, spec.name) for d in installs]
+    results.append(check("installs share one hardlinked blob",
+                         first and os.path.samefile(dests[0], dests[1])))
+    results.append(check("second run skips the download", second and downloads() == first_downloads == 1))
+    return all(results)
+
+
+def main():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            ok = run(f"http://127.0.0.1:{server.server_port}", work)
+    finally:
+        server.shutdown()
+    print("\n[OK] All fetcher checks passed" if ok else "\n[ERROR] Some fetcher checks failed")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()